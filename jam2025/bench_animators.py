@@ -0,0 +1,221 @@
+"""
+Races the second order animators against each other: throughput, and error against a reference.
+
+    python -m jam2025.bench_animators
+    python -m jam2025.bench_animators --params 3,0.5,2 --points 1024
+    python -m jam2025.bench_animators --trace traces/2025-08-01_12-00-00.txt
+
+Every animator is run over the same frame time traces (steady, jittery, spiky, plus any recorded
+ones given with --trace) on three workloads: one float, one Vec2 and an (N, 2) numpy array. The
+reference is the same system integrated with RK4 in tiny substeps, driven by exactly what the
+animators see (the target sampled each frame, moving in a straight line in between), so the error
+is the integrator's alone.
+
+Traces are recorded in game with T (see lib/frame_trace.py for the format); they're saved in the
+"traces" folder of the user data directory.
+"""
+import argparse
+import math
+from collections.abc import Callable
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+import numpy as np
+from pyglet.math import Vec2
+
+from jam2025.lib.frame_trace import load_trace
+from jam2025.lib.procedural_animator import (
+    SecondOrderAnimator,
+    SecondOrderAnimatorBase,
+    SecondOrderAnimatorExact,
+    SecondOrderAnimatorKClamped,
+    SecondOrderAnimatorPoleZero,
+    SecondOrderAnimatorTCritical,
+)
+
+ANIMATORS: dict[str, type[SecondOrderAnimatorBase]] = {
+    "basic": SecondOrderAnimator,
+    "tcritical": SecondOrderAnimatorTCritical,
+    "kclamped": SecondOrderAnimatorKClamped,
+    "polezero": SecondOrderAnimatorPoleZero,
+    "exact": SecondOrderAnimatorExact
+}
+WORKLOADS = ("float", "vec2", "numpy")
+CHANNELS = 8
+"""Distinct target signals; every workload's elements cycle through them."""
+DIVERGED = 1e6
+
+type Trace = np.ndarray
+
+def _steady(rng: np.random.Generator, frames: int, fps: float) -> Trace:
+    return np.full(frames, 1 / fps)
+
+def _jitter(rng: np.random.Generator, frames: int, fps: float) -> Trace:
+    return np.clip(rng.normal(1 / fps, 0.3 / fps, frames), 0.001, None)
+
+def _spiky(rng: np.random.Generator, frames: int, fps: float) -> Trace:
+    # Mostly smooth, with the odd hitch (a GC pause, a webcam stall, a window drag).
+    trace = np.clip(rng.normal(1 / fps, 0.1 / fps, frames), 0.001, None)
+    spikes = rng.random(frames) < 0.02
+    trace[spikes] = rng.uniform(0.05, 0.25, spikes.sum())
+    return trace
+
+SYNTHETIC_TRACES: dict[str, tuple[Callable[[np.random.Generator, int, float], Trace], float]] = {
+    "steady240": (_steady, 240),
+    "steady60": (_steady, 60),
+    "jitter60": (_jitter, 60),
+    "jitter30": (_jitter, 30),
+    "spiky60": (_spiky, 60)
+}
+
+def target(t: np.ndarray) -> np.ndarray:
+    """(times, CHANNELS): smooth motion with a sharp jump now and then, one phase per channel."""
+    phase = np.arange(CHANNELS) * 0.7
+    t = np.asarray(t, np.float64)[..., None]
+    return np.sin(1.3 * t + phase) + 0.5 * np.sin(4.1 * t + 2 * phase) + 0.5 * np.sign(np.sin(0.45 * t + phase))
+
+def reference(trace: Trace, k1: float, k2: float, k3: float, step: float) -> np.ndarray:
+    """(frames, CHANNELS) y after each frame, by RK4 substeps of at most `step` seconds."""
+    times = np.concatenate(([0.0], np.cumsum(trace)))
+    x = target(times)
+    y = x[0].copy()
+    v = np.zeros(CHANNELS)
+    out = np.empty((len(trace), CHANNELS))
+    for i, dt in enumerate(trace):
+        slope = (x[i + 1] - x[i]) / dt
+        forcing_start = x[i] + k3 * slope
+        n = max(1, math.ceil(dt / step))
+        h = dt / n
+        for j in range(n):
+            # Forcing (x + k3 x') at the start, middle and end of the substep
+            f0 = forcing_start + slope * (j * h)
+            f1 = f0 + slope * (h / 2)
+            f2 = f0 + slope * h
+            a1 = (f0 - y - k1 * v) / k2
+            y2, v2 = y + v * (h / 2), v + a1 * (h / 2)
+            a2 = (f1 - y2 - k1 * v2) / k2
+            y3, v3 = y + v2 * (h / 2), v + a2 * (h / 2)
+            a3 = (f1 - y3 - k1 * v3) / k2
+            y4, v4 = y + v3 * h, v + a3 * h
+            a4 = (f2 - y4 - k1 * v4) / k2
+            y = y + (v + 2 * v2 + 2 * v3 + v4) * (h / 6)
+            v = v + (a1 + 2 * a2 + 2 * a3 + a4) * (h / 6)
+        out[i] = y
+    return out
+
+def _workload(kind: str, x: np.ndarray, points: int) -> tuple[list[Any], np.ndarray]:
+    """The per-frame targets for one workload, and which reference channel each output element is."""
+    if kind == "float":
+        return [float(v) for v in x[:, 0]], np.asarray([0])
+    if kind == "vec2":
+        return [Vec2(float(a), float(b)) for a, b in x[:, :2]], np.asarray([0, 1])
+    channels = np.arange(points * 2).reshape(points, 2) % CHANNELS
+    return list(x[:, channels]), channels.ravel()
+
+def _as_array(value: Any) -> np.ndarray:
+    return np.asarray(tuple(value) if isinstance(value, Vec2) else value, np.float64).ravel()
+
+def run(animator: type[SecondOrderAnimatorBase], params: tuple[float, float, float], trace: Trace, kind: str,
+        points: int, ref: np.ndarray, repeat: int) -> dict[str, float]:
+    """Run one animator over one trace and workload; returns steps/s, points/s and its errors."""
+    times = np.concatenate(([0.0], np.cumsum(trace)))
+    targets, channels = _workload(kind, target(times), points)
+    expected = ref[:, channels]
+    first = targets[0]
+    zero = 0.0 if kind == "float" else Vec2() if kind == "vec2" else np.zeros_like(first)
+    dts = trace.tolist()
+
+    best = math.inf
+    errors = None
+    for _ in range(repeat):
+        a = animator(*params, first, first, zero)
+        got = []
+        start = perf_counter()
+        with np.errstate(all="ignore"):
+            for dt, x in zip(dts, targets[1:], strict = True):
+                got.append(a.update(dt, x))
+        best = min(best, perf_counter() - start)
+        if errors is None:
+            errors = np.abs(np.asarray([_as_array(y) for y in got]) - expected)
+
+    assert errors is not None
+    diverged = not np.all(np.isfinite(errors)) or bool(np.max(errors) > DIVERGED)
+    return {
+        "steps_per_second": len(trace) / best,
+        "points_per_second": len(trace) * len(channels) / 2 / best if kind != "float" else len(trace) / best,
+        "rms_error": math.inf if diverged else float(np.sqrt(np.mean(errors ** 2))),
+        "max_error": math.inf if diverged else float(np.max(errors))
+    }
+
+def _error(value: float) -> str:
+    return "diverged" if math.isinf(value) else f"{value:.2e}"
+
+def report(results: dict[tuple[str, str, str, str], dict[str, float]], names: list[str], params: list[str], traces: list[str]) -> str:
+    lines = []
+    for p in params:
+        for kind in WORKLOADS:
+            lines.append(f"\n== {kind}, frequency/damping/response {p} ==")
+            lines.append(f"{'animator':<10} {'steps/s':>10} {'points/s':>12}" + "".join(f" {trace + ' rms':>16} {'max':>9}" for trace in traces))
+            for name in names:
+                rows = [results[(p, kind, trace, name)] for trace in traces]
+                speed = min(r["steps_per_second"] for r in rows)
+                points = min(r["points_per_second"] for r in rows)
+                lines.append(f"{name:<10} {speed:>10.0f} {points:>12.0f}" + "".join(f" {_error(r['rms_error']):>16} {_error(r['max_error']):>9}" for r in rows))
+
+    # One line per animator over everything, for picking update_default_animator.
+    lines.append("\n== overall ==")
+    lines.append(f"{'animator':<10} {'worst rms':>10} {'mean rms':>10} {'diverged':>9} {'steps/s (vec2)':>15}")
+    for name in names:
+        rows = [r for (p, kind, trace, n), r in results.items() if n == name]
+        finite = [r["rms_error"] for r in rows if not math.isinf(r["rms_error"])]
+        diverged = len(rows) - len(finite)
+        worst = max(finite) if finite and not diverged else math.inf
+        mean = sum(finite) / len(finite) if finite else math.inf
+        vec2 = min(r["steps_per_second"] for (p, kind, trace, n), r in results.items() if n == name and kind == "vec2")
+        lines.append(f"{name:<10} {_error(worst):>10} {_error(mean):>10} {diverged:>9} {vec2:>15.0f}")
+    return "\n".join(lines)
+
+def _params(text: str) -> tuple[float, float, float]:
+    values = tuple(float(v) for v in text.split(","))
+    if len(values) != 3 or values[0] <= 0:
+        raise argparse.ArgumentTypeError("expected frequency,damping,response with a positive frequency")
+    return values  # type: ignore -- length checked
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog = "python -m jam2025.bench_animators", description = "Compare the second order animators' speed and accuracy.")
+    parser.add_argument("--animators", default = ",".join(ANIMATORS), help = f"comma separated, from {', '.join(ANIMATORS)}")
+    parser.add_argument("--params", type = _params, action = "append", help = "frequency,damping,response; repeatable (default: 3,0.5,2 and 8,0.2,1)")
+    parser.add_argument("--trace", type = Path, action = "append", default = [], help = "a recorded frame time trace to add; repeatable")
+    parser.add_argument("--seconds", type = float, default = 10, help = "length of the synthetic traces (default: 10)")
+    parser.add_argument("--points", type = int, default = 256, help = "rows in the numpy workload (default: 256)")
+    parser.add_argument("--repeat", type = int, default = 3, help = "timing runs per case, best kept (default: 3)")
+    parser.add_argument("--reference-step", type = float, default = 2.5e-4, help = "RK4 substep of the reference, seconds (default: 2.5e-4)")
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.animators.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ANIMATORS]
+    if unknown:
+        parser.error(f"unknown animator(s): {', '.join(unknown)}")
+    params = args.params or [(3.0, 0.5, 2.0), (8.0, 0.2, 1.0)]
+
+    rng = np.random.default_rng(args.seed)
+    traces = {name: make(rng, round(args.seconds * fps), fps) for name, (make, fps) in SYNTHETIC_TRACES.items()}
+    for path in args.trace:
+        traces[path.stem] = load_trace(path)
+
+    results = {}
+    for p in params:
+        # The k values every animator works out from these, for the reference.
+        base = SecondOrderAnimatorBase(*p, 0.0, 0.0, 0.0)
+        for trace_name, trace in traces.items():
+            ref = reference(trace, base.k1, base.k2, base.k3, args.reference_step)
+            for kind in WORKLOADS:
+                for name in names:
+                    results[(",".join(f"{v:g}" for v in p), kind, trace_name, name)] = run(ANIMATORS[name], p, trace, kind, args.points, ref, args.repeat)
+
+    print(report(results, names, [",".join(f"{v:g}" for v in p) for p in params], list(traces)))
+
+if __name__ == "__main__":
+    main()
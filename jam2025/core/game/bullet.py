@@ -1,104 +1,148 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import inspect
 from itertools import cycle
 import math
 from typing import Any
-from arcade import SpriteCircle, SpriteList, Texture, TextureAnimationSprite, Vec2
-from arcade.math import rotate_point, rand_in_circle
-from arcade.clock import GLOBAL_CLOCK
-from arcade.types import Point2
+from collections.abc import Iterable
+from weakref import WeakKeyDictionary
+from arcade import SpriteCircle, SpriteList, Texture, Vec2
+from arcade.math import rotate_point
+from arcade.clock import GLOBAL_CLOCK, Clock
+from arcade.types import Color, Point2
 import arcade
+import arcade.gl as gl
+import numpy as np
+from numpy.typing import ArrayLike
 
+from jam2025.core.game.bullet_integrator import BULLET_DTYPE, BulletIntegrator
 from jam2025.core.game.score_tracker import ScoreTracker
 from jam2025.core.settings import settings
-from jam2025.data.loading import load_sound, load_spritesheet
+from jam2025.core.sound import sounds
+from jam2025.data.loading import load_gl_texture
 from jam2025.core.game.character import Character
 from jam2025.lib import noa
-from jam2025.lib.typing import NEVER, Seconds
+from jam2025.lib.shader_cache import ShaderSource, get_shader_cache, register
+from jam2025.lib.stage_timer import NULL_TIMER
+from jam2025.lib.typing import FOREVER, NEVER, Seconds
 from jam2025.lib.utils import draw_cross, point_in_circle
 
-bullet_sprite = load_spritesheet("bullet", 1, 30, 30, 30)
-
 class Bullet:
+    SPAWN_SOUND = "blast"
+
+    COLOR: Color = arcade.color.WHITE
+    VULNERABLE_COLOR: Color = arcade.color.WHITE
+    VULNERABLE_AFTER: float = 0.9
+    """Fraction of the lifetime after which the bullet can be collected; NEVER for always, FOREVER for never."""
+
     def __init__(self, radius: float = 10, damage: float = 1, live_time: float = 10, owner: Any = None) -> None:
-        # self.sprite = load_spritesheet("energy_ball", 5, 6, 30, 30)
-        self.sprite = TextureAnimationSprite()
-        self.sprite.textures = bullet_sprite.textures
-        self.sprite.animation = bullet_sprite.animation
-        self.sprite.width = 20
-        self.sprite.height = 20
         self.damage = damage
-        self.live = True
         self.live_time = live_time
-        self.owner: Any = owner
 
-        self.speed: float = 100
-        self.angular_speed: float = 0
-        self.direction = Vec2.from_heading(0)
+        # Where this bullet's record lives, set by the BulletList that spawns it.
+        self._list: BulletList | None = None
+        self._index: int = -1
 
-        self.sound = load_sound('blast')
+        self.reset(owner)
 
-        self._creation_time = GLOBAL_CLOCK.time
+    def reset(self, owner: Any = None) -> None:
+        """Put the bullet back into a fresh state, so pooled bullets can be reused.
 
-        self.on_spawn()
+        Subclasses that change their colour per bullet should pick it here."""
+        self.live = True
+        self.owner: Any = owner
+
+        self.color: Color = self.COLOR
+        self.vulnerable_color: Color = self.VULNERABLE_COLOR
+
+    def attach(self, bullet_list: BulletList, index: int) -> None:
+        """Point this bullet at its record, slot `index` of `bullet_list`; BulletList calls this when the slot moves."""
+        self._list = bullet_list
+        self._index = index
+
+    def detach(self) -> None:
+        """Forget the record, once the bullet has left its BulletList."""
+        self._list = None
+        self._index = -1
+
+    def _record(self, edit: bool = False, fresh: bool = True) -> np.void:
+        """This bullet's record; `fresh` pulls the simulated fields back first, which the static ones don't need."""
+        if self._list is None:
+            raise RuntimeError("Bullet isn't in a BulletList.")
+        if fresh or edit:
+            self._list.integrator.fetch(self._list.data, self._index)
+        if edit:
+            self._list.integrator.mark(self._index)
+        return self._list.data[self._index]
 
     @property
     def position(self) -> Point2:
-        return self.sprite.position
+        x, y = self._record()["position"]
+        return (float(x), float(y))
 
     @position.setter
     def position(self, pos: Point2) -> None:
-        self.sprite.position = pos
+        self._record(edit = True)["position"] = pos
 
     @property
-    def vulnerable(self) -> bool:
-        """Override this for a different system of choosing vulnerablility; currently 90% through lifetime."""
-        return self._creation_time + self.live_time * 0.9 < GLOBAL_CLOCK.time
+    def direction(self) -> Vec2:
+        return Vec2.from_heading(float(self._record()["heading"]))
 
-    def collide(self, character: Character, score_tracker: ScoreTracker) -> None:
-        if self.owner is character:
-            return
-        if point_in_circle(character.position, character.size, self.sprite.position) and self.live:
-            self.on_collide(character, score_tracker)
+    @direction.setter
+    def direction(self, direction: Point2) -> None:
+        self._record(edit = True)["heading"] = math.atan2(direction[1], direction[0])
 
-    def move(self, delta_time: float) -> None:
-        """Override this for non-straight bullets."""
-        self.direction = Vec2.from_heading(self.direction.heading() + (delta_time * self.angular_speed * math.tau))
+    @property
+    def speed(self) -> float:
+        return float(self._record()["speed"])
 
-        dx, dy = self.direction * self.speed * delta_time
-        self.sprite.position = (self.sprite.position[0] + dx, self.sprite.position[1] + dy)
+    @speed.setter
+    def speed(self, speed: float) -> None:
+        self._record(edit = True)["speed"] = speed
 
-    def update(self, delta_time: float) -> None:
-        self.on_update(delta_time)
-        self.move(delta_time)
-        if self._creation_time + self.live_time < GLOBAL_CLOCK.time:
-            self.live = False
-            self.on_death()
-            self.on_timeout()
+    @property
+    def angular_speed(self) -> float:
+        return float(self._record()["angular_speed"])
 
-    def draw(self) -> None:
-        ...
+    @angular_speed.setter
+    def angular_speed(self, angular_speed: float) -> None:
+        self._record(edit = True)["angular_speed"] = angular_speed
 
-    def on_update(self, delta_time: float) -> None:
-        ...
+    @property
+    def creation_time(self) -> Seconds:
+        assert self._list is not None
+        return self._list.epoch + float(self._record(fresh = False)["birth"])
+
+    @property
+    def vulnerable(self) -> bool:
+        """Set VULNERABLE_AFTER for a different point in the lifetime; this has to match the bullet shader."""
+        birth = self.creation_time
+        assert self._list is not None
+        return birth + self.live_time * self.VULNERABLE_AFTER < self._list.clock.time
+
+    def collide(self, character: Character, score_tracker: ScoreTracker) -> None:
+        if self.owner is character:
+            return
+        if point_in_circle(character.position, character.size, self.position) and self.live:
+            self.on_collide(character, score_tracker)
 
     def on_collide(self, character: Character, score_tracker: ScoreTracker) -> None:
         if not character.invincible:
             if self.vulnerable:
                 self.live = False
                 score_tracker.get_kill()
-                character.score_sound.play()
+                sounds.play(character.SCORE_SOUND)
             else:
                 character.health -= self.damage
-                character.hurt_sound.play()
+                sounds.play(character.HURT_SOUND)
                 character.iframes()
                 self.live = False
                 self.on_death()
                 self.on_killed()
 
     def on_spawn(self) -> None:
-        self.sound.play()
+        sounds.play(self.SPAWN_SOUND)
 
     def on_death(self) -> None:
         ...
@@ -111,78 +155,346 @@ class Bullet:
 
 
 class BasicBullet(Bullet):
+    COLOR = arcade.color.RED
+    VULNERABLE_COLOR = arcade.color.GREEN
+
     def __init__(self, radius: float = 10, damage: Seconds = 1, live_time: Seconds = 10, owner: Any = None) -> None:
         super().__init__(radius, damage, live_time, owner)
-        self.sprite.color = arcade.color.RED
-
-    def on_update(self, delta_time: Seconds) -> None:
-        self.sprite.color = arcade.color.GREEN if self.vulnerable else arcade.color.RED
 
 class ScoreBullet(Bullet):
+    COLOR = arcade.color.GREEN
+    VULNERABLE_COLOR = arcade.color.GREEN
+    VULNERABLE_AFTER = NEVER
+
     def __init__(self, radius: float = 10, damage: Seconds = 1, live_time: Seconds = 10, owner: Any = None) -> None:
         super().__init__(radius, damage, live_time, owner)
-        self.sprite.color = arcade.color.GREEN
-
-    @property
-    def vulnerable(self) -> bool:
-        return True
 
 class RainbowBullet(Bullet):
     COLOR_IDX = 0
 
     def __init__(self, radius: float = 10, damage: Seconds = 1, live_time: Seconds = 10, owner: Any = None) -> None:
         super().__init__(radius, damage, live_time, owner)
-        self.sprite.color = noa.get_color(self.__class__.COLOR_IDX, 8, 8)
+
+    def reset(self, owner: Any = None) -> None:
+        super().reset(owner)
+        self.color = noa.get_color(self.__class__.COLOR_IDX, 8, 8)
+        self.vulnerable_color = self.color
         self.__class__.COLOR_IDX += 1
         self.__class__.COLOR_IDX %= 12
 
 class BossBullet(Bullet):
+    COLOR = arcade.color.WHITE
+    VULNERABLE_COLOR = arcade.color.GREEN
+    VULNERABLE_AFTER = FOREVER
+
     def __init__(self, radius: float = 20, damage: Seconds = 1, live_time: Seconds = 10, owner: Any = None) -> None:
         super().__init__(radius, damage, live_time, owner)
 
-    @property
-    def vulnerable(self) -> bool:
-        return False
+class BulletPool:
+    """Keeps dead bullets of one type around so spawning doesn't allocate.
+
+    At most `size` free bullets are kept; anything past that is left for the GC."""
 
-    def on_update(self, delta_time: Seconds) -> None:
-        self.sprite.color = arcade.color.GREEN if self.vulnerable else arcade.color.WHITE
+    def __init__(self, bullet_type: type[Bullet], size: int | None = None) -> None:
+        self.bullet_type = bullet_type
+        self.size = size if size is not None else settings.bullet_pool_size
+        self.free: list[Bullet] = []
+
+        # Pooled bullets are always made with the defaults, so this is known without making one.
+        self.live_time: Seconds = inspect.signature(bullet_type).parameters["live_time"].default
+
+    def _create(self) -> Bullet:
+        return self.bullet_type()
+
+    def acquire(self, owner: Any = None) -> Bullet:
+        if not self.free:
+            return self._create()
+        bullet = self.free.pop()
+        bullet.reset(owner)
+        return bullet
+
+    def release(self, bullet: Bullet) -> None:
+        if len(self.free) < self.size:
+            self.free.append(bullet)
+
+    def prewarm(self, count: int) -> None:
+        """Allocate bullets up front until there are `count` free (or the pool is full)."""
+        count = min(count, self.size)
+        while len(self.free) < count:
+            self.free.append(self._create())
+
+    def bullets_for(self, pattern: BulletPattern) -> int:
+        """Roughly how many of this pool's bullets `pattern` keeps alive at once."""
+        return math.ceil(len(pattern.times) * self.live_time / pattern.loop_time)
+
+    def clear(self) -> None:
+        self.free.clear()
+
+class BulletRenderer:
+    """Draws every bullet in a BulletList as one instanced quad draw.
+
+    The animation frame and the vulnerable colour swap are both worked out in the shader
+    from each bullet's birth time, so the CPU only uploads the bullet records once per frame."""
+
+    VERTEX_SHADER = r"""#version 330
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+uniform float time;
+uniform float size;
+uniform float fps;
+uniform int frames;
+uniform ivec2 grid; // columns, rows
+
+in vec2 in_vert;
+
+in vec2 in_position;
+in vec3 in_timing; // birth, live time, vulnerable after
+in vec4 in_color;
+in vec4 in_vulnerable_color;
+
+out vec2 vs_uv;
+out vec4 vs_colour;
+
+void main(){
+    float age = time - in_timing.x;
+    int frame = int(age * fps) % frames;
+    vec2 cell = vec2(frame % grid.x, grid.y - 1 - frame / grid.x);
+    vs_uv = (cell + in_vert + 0.5) / vec2(grid);
+
+    vs_colour = (age > in_timing.y * in_timing.z) ? in_vulnerable_color : in_color;
+
+    gl_Position = window.projection * window.view * vec4(in_position + in_vert * size, 0.0, 1.0);
+}
+"""
+    FRAGMENT_SHADER = r"""#version 330
+uniform sampler2D sheet;
+
+in vec2 vs_uv;
+in vec4 vs_colour;
+
+out vec4 fs_colour;
+
+void main(){
+    fs_colour = texture(sheet, vs_uv) * vs_colour;
+}
+"""
+
+    PROGRAM = register(ShaderSource(VERTEX_SHADER, FRAGMENT_SHADER))
+
+    def __init__(self, sheet: str = "bullet", rows: int = 1, cols: int = 30, frames: int = 30, fps: float = 30,
+                 size: float = 20, capacity: int = 256) -> None:
+        self.ctx = ctx = arcade.get_window().ctx
+        self.sheet = load_gl_texture(sheet)
+        self.rows, self.cols, self.frames, self.fps, self.size = rows, cols, frames, fps, size
+
+        self._quad = ctx.buffer(data=np.asarray([(-0.5, -0.5), (0.5, -0.5), (-0.5, 0.5), (0.5, 0.5)], np.float32).tobytes())
+        self._instances = ctx.buffer(reserve=capacity * BULLET_DTYPE.itemsize, usage="stream")
+        self._geometries: WeakKeyDictionary[gl.Buffer, gl.Geometry] = WeakKeyDictionary()
+        self._program = get_shader_cache(ctx).program(BulletRenderer.PROGRAM)
+
+    def _geometry(self, buffer: gl.Buffer) -> gl.Geometry:
+        if buffer not in self._geometries:
+            self._geometries[buffer] = self.ctx.geometry(
+                [
+                    gl.BufferDescription(self._quad, '2f', ['in_vert']),
+                    gl.BufferDescription(buffer, '2f 3x4 3f 4f1 4f1',
+                                         ['in_position', 'in_timing', 'in_color', 'in_vulnerable_color'], instanced=True)
+                ],
+                mode=self.ctx.TRIANGLE_STRIP
+            )
+        return self._geometries[buffer]
+
+    def draw(self, data: np.ndarray, time: Seconds) -> None:
+        """Upload `data` (bullet records) and draw it."""
+        if not len(data):
+            return
+        if data.nbytes > self._instances.size:
+            self._instances.orphan(size = data.nbytes * 2)
+        self._instances.write(data)
+        self.render(self._instances, len(data), time)
+
+    def render(self, buffer: gl.Buffer, count: int, time: Seconds) -> None:
+        """Draw the first `count` bullet records already in `buffer`."""
+        if not count:
+            return
+        # The program is shared with every other BulletRenderer, so all of these are set per draw.
+        self._program['time'] = time
+        self._program['size'] = self.size
+        self._program['fps'] = self.fps
+        self._program['frames'] = self.frames
+        self._program['grid'] = self.cols, self.rows
+        self._program['sheet'] = 0
+        self.sheet.use(0)
+        with self.ctx.enabled(self.ctx.BLEND):
+            self._geometry(buffer).render(self._program, vertices = 4, instances = count)
+
+REBASE_AFTER: Seconds = 600.0
+"""Births are stored as float32 seconds since BulletList.epoch (the GPU only does 32 bit floats), so the
+epoch moves up this often to keep them accurate to well under a millisecond."""
 
 class BulletList:
-    def __init__(self, bullets: list[Bullet] | None = None) -> None:
-        self.bullets = bullets if bullets else []
-        self.sprite_list = SpriteList()
+    def __init__(self, capacity: int = 256, integrator: BulletIntegrator | None = None, clock: Clock | None = None) -> None:
+        self.bullets: list[Bullet] = []
+        # Bullet lifetimes (and the emitters firing into this list) run on this clock.
+        self.clock = clock or GLOBAL_CLOCK
+        self.epoch: Seconds = self.clock.time
+        self.timer = NULL_TIMER
+        self.data = np.zeros(capacity, BULLET_DTYPE)
+        self.pools: dict[type[Bullet], BulletPool] = {}
+        self.integrator = integrator or BulletIntegrator()
+        self.integrator.resize(self.data, 0)
+
+        # Needs a window, and BulletLists get made before there is one.
+        self._renderer: BulletRenderer | None = None
+
+    @property
+    def live_data(self) -> np.ndarray:
+        """The records of every live bullet, in the same order as `bullets`."""
+        return self.data[:len(self.bullets)]
+
+    @property
+    def local_time(self) -> Seconds:
+        """The clock's time relative to `epoch`, which is what the records' births are in."""
+        return self.clock.time - self.epoch
+
+    def rebase(self) -> None:
+        """Move `epoch` up to now, shifting every live bullet's birth to match."""
+        now = self.clock.time
+        count = len(self.bullets)
+        if count:
+            # Births are static on the GPU, so bring the CPU records up to date and upload them all again.
+            self.integrator.sync(self.data, count)
+            self.data["birth"][:count] -= now - self.epoch
+            self.integrator.mark(0)
+        self.epoch = now
+
+    def _grow(self) -> None:
+        count = len(self.bullets)
+        self.integrator.sync(self.data, count)
+        data = np.zeros(len(self.data) * 2, BULLET_DTYPE)
+        data[:count] = self.data[:count]
+        self.data = data
+        self.integrator.resize(self.data, count)
 
     def spawn_bullet(self, bullet_type: type[Bullet], pos: Point2, direction: Point2 = (0, 0),
                      speed: float = 100, angular_speed: float = 0,
                      owner: Any = None) -> None:
-        new_bullet = bullet_type()
-        new_bullet.position = pos
-        new_bullet.direction = Vec2(*direction)
-        new_bullet.speed = speed
-        new_bullet.angular_speed = angular_speed
-        new_bullet.owner = owner
-        self.bullets.append(new_bullet)
-        self.sprite_list.append(new_bullet.sprite)
+        self.spawn_many(bullet_type, pos, [direction], speed, angular_speed, owner)
+
+    def spawn_many(self, bullet_type: type[Bullet], positions: ArrayLike, directions: ArrayLike,
+                   speeds: ArrayLike = 100, angular_speeds: ArrayLike = 0,
+                   owner: Any = None) -> None:
+        """Spawn one bullet per row of `directions` in a single go.
+
+        `positions` is either one point for every bullet or one per bullet, and the same goes for
+        `speeds` and `angular_speeds`. Directions don't need to be normalized."""
+        directions = np.asarray(directions, np.float64).reshape(-1, 2)
+        count = len(directions)
+        if not count:
+            return
+
+        start = len(self.bullets)
+        while start + count > len(self.data):
+            self._grow()
+
+        pool = self.get_pool(bullet_type)
+        new_bullets = [pool.acquire(owner) for _ in range(count)]
+        for idx, bullet in enumerate(new_bullets, start):
+            bullet.attach(self, idx)
+        self.bullets.extend(new_bullets)
+
+        records = self.data[start:start + count]
+        records["position"] = positions
+        records["heading"] = np.arctan2(directions[:, 1], directions[:, 0])
+        records["speed"] = speeds
+        records["angular_speed"] = angular_speeds
+        records["birth"] = self.local_time
+        records["live_time"] = [bullet.live_time for bullet in new_bullets]
+        records["vulnerable_after"] = bullet_type.VULNERABLE_AFTER
+        records["color"] = [bullet.color for bullet in new_bullets]
+        records["vulnerable_color"] = [bullet.vulnerable_color for bullet in new_bullets]
+        self.integrator.mark(start)
+
+        for bullet in new_bullets:
+            bullet.on_spawn()
+
+    def get_pool(self, bullet_type: type[Bullet]) -> BulletPool:
+        if bullet_type not in self.pools:
+            self.pools[bullet_type] = BulletPool(bullet_type)
+        return self.pools[bullet_type]
+
+    def prewarm(self, emitters: Iterable[BulletEmitter]) -> None:
+        """Fill each bullet type's pool with about one bullet lifetime's worth of the emitters' patterns."""
+        needed: dict[type[Bullet], int] = {}
+        for emitter in emitters:
+            if emitter.current_pattern is None:
+                continue
+            pool = self.get_pool(emitter.bullet_type)
+            needed[emitter.bullet_type] = needed.get(emitter.bullet_type, 0) + pool.bullets_for(emitter.current_pattern)
+
+        for bullet_type, count in needed.items():
+            self.pools[bullet_type].prewarm(count)
+
+    def swap_remove(self, index: int) -> None:
+        """Remove the bullet at `index` in O(1) by moving the last bullet (and its record) into its place."""
+        last = len(self.bullets) - 1
+        bullet = self.bullets[index]
+        if index != last:
+            moved = self.bullets[last]
+            self.bullets[index] = moved
+            moved.attach(self, index)
+            self.integrator.flush(self.data, last + 1)
+            self.data[index] = self.data[last]
+            self.integrator.copy(last, index)
+        self.bullets.pop()
+
+        bullet.detach()
+        self.get_pool(type(bullet)).release(bullet)
 
     def reset(self) -> None:
+        for bullet in self.bullets:
+            bullet.detach()
+            self.get_pool(type(bullet)).release(bullet)
         self.bullets.clear()
-        self.sprite_list.clear()
+        self.epoch = self.clock.time
 
     def update(self, delta_time: float, character: Character, score_tracker: ScoreTracker) -> None:
-        for bullet in self.bullets:
-            bullet.update(delta_time)
-            bullet.collide(character, score_tracker)
-
-        for bullet in [b for b in self.bullets if not b.live]:
-            self.bullets.remove(bullet)
-            self.sprite_list.remove(bullet.sprite)
-
-        self.sprite_list.update_animation(delta_time)
+        count = len(self.bullets)
+        if not count:
+            return
+        if self.local_time > REBASE_AFTER:
+            self.rebase()
+        with self.timer("movement"):
+            self.integrator.step(self.data, count, delta_time)
+
+        with self.timer("cleanup"):
+            data = self.live_data
+            timed_out = np.flatnonzero(data["birth"] + data["live_time"] < self.local_time)
+            for idx in timed_out:
+                bullet = self.bullets[idx]
+                bullet.live = False
+                bullet.on_death()
+                bullet.on_timeout()
+
+        with self.timer("collision"):
+            touching = self.integrator.touching(self.data, count, character.position, character.size)
+            for idx in touching:
+                self.bullets[idx].collide(character, score_tracker)
+
+        with self.timer("cleanup"):
+            # Going back to front means whatever gets swapped into a dead slot is always alive.
+            dead = {int(idx) for idx in timed_out}
+            dead.update(int(idx) for idx in touching if not self.bullets[idx].live)
+            for idx in sorted(dead, reverse=True):
+                self.swap_remove(idx)
 
     def draw(self) -> None:
-        self.sprite_list.draw()
-        for bullet in self.bullets:
-            bullet.draw()
+        if self._renderer is None:
+            self._renderer = BulletRenderer()
+        self.integrator.draw(self._renderer, self.data, len(self.bullets), self.local_time)
 
 class BulletEmitter:
     def __init__(self, pos: Point2, bullet_list: BulletList, bullet_type: type[Bullet] = Bullet, starting_pattern: BulletPattern | None = None) -> None:
@@ -196,15 +508,26 @@ class BulletEmitter:
         self.bullet_list = bullet_list
 
         self.current_pattern: BulletPattern | None = starting_pattern
-        self.current_pattern_start_time: Seconds = GLOBAL_CLOCK.time
+        self.current_pattern_start_time: Seconds = self.clock.time
+        self.cursor: PatternCursor | None = None if starting_pattern is None else PatternCursor(starting_pattern)
 
         self.direction = 0.0
         self.vulnerable = False
         self.live = True
 
+    @property
+    def clock(self) -> Clock:
+        """The clock of the BulletList this emitter fires into."""
+        return self.bullet_list.clock
+
+    def restart(self) -> None:
+        """Play the current pattern again from the start."""
+        self.set_pattern(self.current_pattern)
+
     def set_pattern(self, new_pattern: BulletPattern | None) -> None:
         self.current_pattern = new_pattern
-        self.current_pattern_start_time = GLOBAL_CLOCK.time
+        self.current_pattern_start_time = self.clock.time
+        self.cursor = None if new_pattern is None else PatternCursor(new_pattern)
 
     def collide(self, character: Character, score_tracker: ScoreTracker) -> None:
         if point_in_circle(character.position, character.size, self.sprite.position):
@@ -214,15 +537,24 @@ class BulletEmitter:
                     score_tracker.get_kill()
 
     def update(self, delta_time: float) -> None:
-        if not self.current_pattern or not self.live:
+        if not self.cursor or not self.live:
             return
-        new_events = self.current_pattern.get_events(GLOBAL_CLOCK.time - self.current_pattern_start_time)
-        for e in new_events:
-            v = Vec2(e.direction_x, e.direction_y).normalize()
-            v = v.rotate(self.direction)
-            angular_speed = 0 if not e.radius else (e.speed / (math.tau * e.radius))
-            self.bullet_list.spawn_bullet(self.bullet_type, self.sprite.position,
-                                          v, e.speed, angular_speed)
+        new_events = self.cursor.get_events(self.clock.time - self.current_pattern_start_time)
+        if not len(new_events):
+            return
+        directions, angular_speeds = self.aim(new_events)
+        self.bullet_list.spawn_many(self.bullet_type, self.sprite.position,
+                                    directions, new_events.speeds, angular_speeds)
+
+    def aim(self, events: EventBatch) -> tuple[np.ndarray, np.ndarray]:
+        """Turn a batch of events into bullet directions (rotated by the emitter's direction) and angular speeds."""
+        c, s = math.cos(self.direction), math.sin(self.direction)
+        dx, dy = events.directions[:, 0], events.directions[:, 1]
+        directions = np.stack((dx * c - dy * s, dx * s + dy * c), axis = 1)
+        angular_speeds = np.divide(events.speeds, math.tau * events.radii,
+                                   out = np.zeros_like(events.speeds), where = events.radii != 0)
+        return directions, angular_speeds
+
     def draw(self) -> None:
         if self.live:
             self.sprite_list.draw()
@@ -255,7 +587,7 @@ class SpinningBulletEmitter(BulletEmitter):
         self.spin_speed = spin_speed
 
     def update(self, delta_time: Seconds) -> None:
-        self.sprite.position = rotate_point(self.original_pos[0], self.original_pos[1], self.anchor_pos[0], self.anchor_pos[1], GLOBAL_CLOCK.time * self.spin_speed * 360)
+        self.sprite.position = rotate_point(self.original_pos[0], self.original_pos[1], self.anchor_pos[0], self.anchor_pos[1], self.clock.time * self.spin_speed * 360)
         super().update(delta_time)
 
     def draw(self) -> None:
@@ -270,18 +602,32 @@ class RandomizedBulletEmitter(BulletEmitter):
     def __init__(self, pos: Point2, spread: float, bullet_list: BulletList, bullet_type: type[Bullet] = Bullet, starting_pattern: BulletPattern | None = None) -> None:
         super().__init__(pos, bullet_list, bullet_type, starting_pattern)
         self.spread = spread
+        self.rng = np.random.default_rng()
 
     def update(self, delta_time: float) -> None:
-        if not self.current_pattern or not self.live:
+        if not self.cursor or not self.live:
             return
-        new_events = self.current_pattern.get_events(GLOBAL_CLOCK.time - self.current_pattern_start_time)
-        for e in new_events:
-            v = Vec2(e.direction_x, e.direction_y).normalize()
-            v = v.rotate(self.direction)
-            angular_speed = 0 if not e.radius else (e.speed / (math.tau * e.radius))
-            bpos = rand_in_circle(self.sprite.position, self.spread)
-            self.bullet_list.spawn_bullet(self.bullet_type, bpos,
-                                          v, e.speed, angular_speed)
+        new_events = self.cursor.get_events(self.clock.time - self.current_pattern_start_time)
+        if not len(new_events):
+            return
+        directions, angular_speeds = self.aim(new_events)
+        # Same spread as arcade's rand_in_circle, one point per event.
+        angles = self.rng.uniform(0, math.tau, len(new_events))
+        radii = self.spread * np.sqrt(self.rng.uniform(0, 1, len(new_events)))
+        positions = np.stack((radii * np.cos(angles), radii * np.sin(angles)), axis = 1) + self.sprite.position
+        self.bullet_list.spawn_many(self.bullet_type, positions,
+                                    directions, new_events.speeds, angular_speeds)
+
+class AimedBulletEmitter(BulletEmitter):
+    """Points its pattern (angle 0 in pattern space) at `target` every time it fires; pairs well with `fan` patterns."""
+    def __init__(self, pos: Point2, bullet_list: BulletList, bullet_type: type[Bullet] = Bullet, starting_pattern: BulletPattern | None = None, target: Character | None = None) -> None:
+        super().__init__(pos, bullet_list, bullet_type, starting_pattern)
+        self.target = target
+
+    def update(self, delta_time: float) -> None:
+        if self.target is not None:
+            self.direction = math.atan2(self.target.position[1] - self.sprite.position[1], self.target.position[0] - self.sprite.position[0])
+        super().update(delta_time)
 
 # TODO: bullet pos offset (rotate with emiiter direction?)
 @dataclass
@@ -292,28 +638,111 @@ class BulletEvent:
     speed: float = 100
     radius: float = 0
 
+@dataclass
+class EventBatch:
+    """Every event a pattern fired in one `get_events` call, as parallel arrays."""
+    times: np.ndarray
+    directions: np.ndarray  # (n, 2), normalized
+    speeds: np.ndarray
+    radii: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @classmethod
+    def from_events(cls, events: list[BulletEvent]) -> EventBatch:
+        """Compile events in any order: sorted by time, with their directions normalized."""
+        events = sorted(events, key = lambda x: x.time)
+        directions = np.asarray([(e.direction_x, e.direction_y) for e in events], np.float64).reshape(-1, 2)
+        lengths = np.hypot(directions[:, 0], directions[:, 1])
+        return cls(
+            np.asarray([e.time for e in events], np.float64),
+            np.divide(directions, lengths[:, None], out = np.zeros_like(directions), where = lengths[:, None] > 0),
+            np.asarray([e.speed for e in events], np.float64),
+            np.asarray([e.radius for e in events], np.float64)
+        )
+
+NO_EVENTS = EventBatch(np.zeros(0), np.zeros((0, 2)), np.zeros(0), np.zeros(0))
+
 class BulletPattern:
-    def __init__(self, loop_time: Seconds, pattern: list[BulletEvent]) -> None:
+    """A looping list of events, compiled once into read-only arrays.
+
+    Patterns don't hold any playback state, so one pattern can be shared by any number of emitters;
+    each of them plays it through its own PatternCursor."""
+
+    def __init__(self, loop_time: Seconds, pattern: list[BulletEvent] | EventBatch) -> None:
+        """`pattern` is either events in any order, or an already compiled EventBatch (sorted by time, unit
+        directions), whose arrays the pattern takes over."""
+        events = pattern if isinstance(pattern, EventBatch) else EventBatch.from_events(pattern)
         self.loop_time = loop_time
+        self.times = events.times
+        self.directions = events.directions
+        self.speeds = events.speeds
+        self.radii = events.radii
+
+        for arr in (self.times, self.directions, self.speeds, self.radii):
+            arr.flags.writeable = False
+
+    @classmethod
+    def from_arrays(cls, loop_time: Seconds, times: ArrayLike, directions: ArrayLike, speeds: ArrayLike, radii: ArrayLike) -> BulletPattern:
+        """Build a pattern straight from already compiled arrays (sorted by time, unit directions)."""
+        return cls(loop_time, EventBatch(
+            np.array(times, np.float64),
+            np.array(directions, np.float64).reshape(-1, 2),
+            np.array(speeds, np.float64),
+            np.array(radii, np.float64)
+        ))
+
+    @property
+    def pattern(self) -> list[BulletEvent]:
+        return [BulletEvent(float(t), float(d[0]), float(d[1]), float(s), float(r))
+                for t, d, s, r in zip(self.times, self.directions, self.speeds, self.radii, strict = True)]
+
+    def count(self, time: Seconds) -> int:
+        """How many events have fired (counting every loop) by `time`."""
+        loops, loop_time = divmod(time, self.loop_time)
+        return int(loops) * len(self.times) + int(np.searchsorted(self.times, loop_time, side = "right"))
+
+    def events(self, start: int, end: int) -> EventBatch:
+        """Fired events `start` up to `end`, numbered the same way as `count`."""
+        if not len(self.times) or end <= start:
+            return NO_EVENTS
+        fired = np.arange(start, end)
+        loops, idx = np.divmod(fired, len(self.times))
+        return EventBatch(loops * self.loop_time + self.times[idx], self.directions[idx], self.speeds[idx], self.radii[idx])
+
+    def mix(self, new_events: list[BulletEvent] | BulletPattern) -> BulletPattern:
+        """This pattern's events plus `new_events` (events or another pattern's), played on this pattern's loop."""
+        other = new_events if isinstance(new_events, BulletPattern) else BulletPattern(self.loop_time, new_events)
+        times = np.concatenate((self.times, other.times))
+        order = np.argsort(times, kind = "stable")
+        return BulletPattern(self.loop_time, EventBatch(
+            times[order],
+            np.concatenate((self.directions, other.directions))[order],
+            np.concatenate((self.speeds, other.speeds))[order],
+            np.concatenate((self.radii, other.radii))[order]
+        ))
+
+class PatternCursor:
+    """Where one emitter is in a (shared) BulletPattern."""
+
+    def __init__(self, pattern: BulletPattern) -> None:
         self.pattern = pattern
+        self._fired = 0
+        self._last_time = NEVER
+
+    def get_events(self, time: Seconds) -> EventBatch:
+        """Every event between the last call and `time` (seconds since the pattern started), in order.
+
+        Catches up across as many loops as `time` skipped over; going backwards in time restarts the pattern.
+        The first call (and the first after a restart) starts from the beginning of the loop `time` is in."""
+        if time < self._last_time or self._last_time == NEVER:
+            self._fired = max(0, int(time // self.pattern.loop_time)) * len(self.pattern.times)
+        self._last_time = time
 
-        self._current_pattern = pattern.copy()
-        self._last_pattern_time = NEVER
-
-    def get_events(self, time: Seconds) -> list[BulletEvent]:
-        current_pattern_time = time % self.loop_time
-        if self._last_pattern_time > current_pattern_time:
-            self._current_pattern = self.pattern.copy()
-        returned_patterns = [p for p in self._current_pattern if p.time <= current_pattern_time]
-        for p in returned_patterns:
-            self._current_pattern.remove(p)
-        self._last_pattern_time = current_pattern_time
-        return returned_patterns
-
-    def mix(self, new_events: list[BulletEvent]) -> BulletPattern:
-        events = self.pattern + new_events
-        events.sort(key = lambda x: x.time)
-        return BulletPattern(self.loop_time, events)
+        end = self.pattern.count(time)
+        start, self._fired = self._fired, max(self._fired, end)
+        return self.pattern.events(start, end)
 
 emitter_tex: Texture | None = None
 
@@ -0,0 +1,273 @@
+"""
+Bullet movement, either on the CPU with numpy or on the GPU with transform feedback.
+"""
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import arcade
+import arcade.gl as gl
+import numpy as np
+
+from jam2025.lib.shader_cache import ShaderSource, get_shader_cache, register
+from jam2025.lib.typing import Seconds
+
+if TYPE_CHECKING:
+    from jam2025.core.game.bullet import BulletRenderer
+
+# Every live bullet is one record in BulletList.data; the whole thing gets uploaded as-is for drawing.
+BULLET_DTYPE = np.dtype([
+    ("position", np.float32, 2),
+    ("heading", np.float32),
+    ("speed", np.float32),
+    ("angular_speed", np.float32),
+    ("birth", np.float32),
+    ("live_time", np.float32),
+    ("vulnerable_after", np.float32),
+    ("color", np.uint8, 4),
+    ("vulnerable_color", np.uint8, 4),
+])
+
+# Buffer layout of a bullet record, for anything reading BulletList data on the GPU.
+BULLET_FORMAT = "2f 3f 3f 2u"
+BULLET_ATTRIBUTES = ["in_position", "in_motion", "in_timing", "in_colors"]
+
+TOUCH_DTYPE = np.dtype([
+    ("index", np.int32),
+    ("position", np.float32, 2),
+    ("heading", np.float32),
+])
+
+
+class BulletIntegrator:
+    """
+    Moves bullets on the CPU, in place in the BulletList's records.
+
+    This is the reference the GPU integrator has to match.
+    """
+
+    def mark(self, index: int) -> None:
+        """Record `index` was written on the CPU and needs to reach wherever bullets are simulated."""
+        ...
+
+    def flush(self, data: np.ndarray, count: int) -> None:
+        """Push every marked record."""
+        ...
+
+    def copy(self, source: int, destination: int) -> None:
+        """Copy a record from one slot to another (BulletList.swap_remove)."""
+        ...
+
+    def resize(self, data: np.ndarray, count: int) -> None:
+        """BulletList.data has grown; `data` is the new array."""
+        ...
+
+    def sync(self, data: np.ndarray, count: int) -> None:
+        """Bring every CPU record up to date with the simulation."""
+        ...
+
+    def fetch(self, data: np.ndarray, index: int) -> None:
+        """Bring one CPU record up to date with the simulation."""
+        ...
+
+    def step(self, data: np.ndarray, count: int, delta_time: Seconds) -> None:
+        live = data[:count]
+        heading = live["heading"]
+        heading += delta_time * live["angular_speed"] * math.tau
+
+        step = live["speed"] * delta_time
+        position = live["position"]
+        position[:, 0] += np.cos(heading) * step
+        position[:, 1] += np.sin(heading) * step
+
+    def touching(self, data: np.ndarray, count: int, position: tuple[float, float], radius: float) -> np.ndarray:
+        """Indices of every bullet within `radius` of `position`.
+
+        Those bullets' CPU records are guaranteed to be up to date afterwards."""
+        offset = data["position"][:count] - np.asarray(position, np.float32)
+        return np.flatnonzero(np.einsum("ij,ij->i", offset, offset) <= radius * radius)
+
+    def draw(self, renderer: BulletRenderer, data: np.ndarray, count: int, time: Seconds) -> None:
+        renderer.draw(data[:count], time)
+
+
+class GPUBulletIntegrator(BulletIntegrator):
+    """
+    Moves bullets in a vertex program with transform feedback, ping-ponging between two buffers
+    (the same approach as tests/lux_blob_test.py).
+
+    The GPU copy is the real one and CPU positions go stale; only the bullets `touching` finds
+    (the only ones that can collide) get read back each tick, and reading them again before the next
+    step costs nothing. Works on software GL (Mesa llvmpipe) too.
+    """
+
+    INTEGRATE_SHADER = r"""#version 330
+uniform float dt;
+
+in vec2 in_position;
+in vec3 in_motion; // heading, speed, angular speed (turns per second)
+in vec3 in_timing;
+in uvec2 in_colors;
+
+out vec2 out_position;
+out vec3 out_motion;
+out vec3 out_timing;
+flat out uvec2 out_colors;
+
+void main(){
+    float heading = in_motion.x + dt * in_motion.z * 6.283185307179586;
+    out_position = in_position + vec2(cos(heading), sin(heading)) * (in_motion.y * dt);
+    out_motion = vec3(heading, in_motion.yz);
+    out_timing = in_timing;
+    out_colors = in_colors;
+}
+"""
+
+    SELECT_VERTEX_SHADER = r"""#version 330
+in vec2 in_position;
+in vec3 in_motion;
+
+out vec2 vs_position;
+out float vs_heading;
+flat out int vs_index;
+
+void main(){
+    vs_position = in_position;
+    vs_heading = in_motion.x;
+    vs_index = gl_VertexID;
+}
+"""
+
+    SELECT_GEOMETRY_SHADER = r"""#version 330
+layout(points) in;
+layout(points, max_vertices = 1) out;
+
+uniform vec3 target; // xy: position, z: radius
+
+in vec2 vs_position[];
+in float vs_heading[];
+flat in int vs_index[];
+
+flat out int out_index;
+out vec2 out_position;
+out float out_heading;
+
+void main(){
+    vec2 offset = vs_position[0] - target.xy;
+    if (dot(offset, offset) <= target.z * target.z){
+        out_index = vs_index[0];
+        out_position = vs_position[0];
+        out_heading = vs_heading[0];
+        EmitVertex();
+        EndPrimitive();
+    }
+}
+"""
+
+    INTEGRATE_PROGRAM = register(ShaderSource(INTEGRATE_SHADER, varyings=("out_position", "out_motion", "out_timing", "out_colors")))
+    SELECT_PROGRAM = register(ShaderSource(SELECT_VERTEX_SHADER, geometry_shader=SELECT_GEOMETRY_SHADER, varyings=("out_index", "out_position", "out_heading")))
+
+    def __init__(self, capacity: int = 256, ctx: arcade.ArcadeContext | None = None) -> None:
+        self.ctx = ctx or arcade.get_window().ctx
+
+        shaders = get_shader_cache(self.ctx)
+        self._integrate_program = shaders.program(GPUBulletIntegrator.INTEGRATE_PROGRAM)
+        self._select_program = shaders.program(GPUBulletIntegrator.SELECT_PROGRAM)
+        self._query = self.ctx.query(samples=False, time=False, primitives=True)
+
+        self._dirty: int | None = None
+        # Records `touching` read back since the last step, which `fetch` can leave alone.
+        self._fresh: set[int] = set()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.buffer_1 = self.ctx.buffer(reserve=capacity * BULLET_DTYPE.itemsize, usage="dynamic")
+        self.buffer_2 = self.ctx.buffer(reserve=capacity * BULLET_DTYPE.itemsize, usage="dynamic")
+        self.touch_buffer = self.ctx.buffer(reserve=capacity * TOUCH_DTYPE.itemsize, usage="stream")
+
+        self.geometry_1 = self.ctx.geometry([gl.BufferDescription(self.buffer_1, BULLET_FORMAT, BULLET_ATTRIBUTES)], mode=gl.POINTS)
+        self.geometry_2 = self.ctx.geometry([gl.BufferDescription(self.buffer_2, BULLET_FORMAT, BULLET_ATTRIBUTES)], mode=gl.POINTS)
+
+    @property
+    def buffer(self) -> gl.Buffer:
+        """The buffer holding the current bullet records."""
+        return self.buffer_1
+
+    def _swap(self) -> None:
+        self.buffer_1, self.buffer_2 = self.buffer_2, self.buffer_1
+        self.geometry_1, self.geometry_2 = self.geometry_2, self.geometry_1
+
+    def mark(self, index: int) -> None:
+        self._dirty = index if self._dirty is None else min(self._dirty, index)
+
+    def flush(self, data: np.ndarray, count: int) -> None:
+        if self._dirty is None:
+            return
+        if self._dirty < count:
+            self.buffer_1.write(data[self._dirty:count], offset=self._dirty * BULLET_DTYPE.itemsize)
+        self._dirty = None
+
+    def copy(self, source: int, destination: int) -> None:
+        size = BULLET_DTYPE.itemsize
+        self.buffer_1.copy_from_buffer(self.buffer_1, size=size, offset=destination * size, source_offset=source * size)
+        if source in self._fresh:
+            self._fresh.add(destination)
+        else:
+            self._fresh.discard(destination)
+
+    def resize(self, data: np.ndarray, count: int) -> None:
+        self._allocate(len(data))
+        self._fresh.clear()
+        if count:
+            self.buffer_1.write(data[:count])
+
+    def sync(self, data: np.ndarray, count: int) -> None:
+        self.flush(data, count)
+        if not count:
+            return
+        # Only the fields the simulation changes need copying back.
+        records = np.frombuffer(self.buffer_1.read(size=count * BULLET_DTYPE.itemsize), BULLET_DTYPE)
+        data["position"][:count] = records["position"]
+        data["heading"][:count] = records["heading"]
+
+    def fetch(self, data: np.ndarray, index: int) -> None:
+        if (self._dirty is not None and index >= self._dirty) or index in self._fresh:
+            # Not uploaded yet, or read back by `touching` this tick, so the CPU record is current.
+            return
+        size = BULLET_DTYPE.itemsize
+        record = np.frombuffer(self.buffer_1.read(size=size, offset=index * size), BULLET_DTYPE)[0]
+        data[index]["position"] = record["position"]
+        data[index]["heading"] = record["heading"]
+
+    def step(self, data: np.ndarray, count: int, delta_time: Seconds) -> None:
+        self.flush(data, count)
+        self._fresh.clear()
+        if not count:
+            return
+        self._integrate_program["dt"] = delta_time
+        self.geometry_1.transform(self._integrate_program, self.buffer_2, vertices=count)
+        self._swap()
+
+    def touching(self, data: np.ndarray, count: int, position: tuple[float, float], radius: float) -> np.ndarray:
+        self.flush(data, count)
+        if not count:
+            return np.zeros(0, np.intp)
+        self._select_program["target"] = position[0], position[1], radius
+        with self._query:
+            self.geometry_1.transform(self._select_program, self.touch_buffer, vertices=count)
+        found = self._query.primitives_generated
+        if not found:
+            return np.zeros(0, np.intp)
+
+        touches = np.frombuffer(self.touch_buffer.read(size=found * TOUCH_DTYPE.itemsize), TOUCH_DTYPE)
+        indices = touches["index"].astype(np.intp)
+        data["position"][indices] = touches["position"]
+        data["heading"][indices] = touches["heading"]
+        self._fresh.update(indices.tolist())
+        return indices
+
+    def draw(self, renderer: BulletRenderer, data: np.ndarray, count: int, time: Seconds) -> None:
+        self.flush(data, count)
+        renderer.render(self.buffer_1, count, time)
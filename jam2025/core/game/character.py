@@ -2,10 +2,12 @@ from arcade import Vec2
 import arcade
 
 from jam2025.core.game.lux import LuxRenderer
-from jam2025.data.loading import load_sound
 from jam2025.core.settings import settings
 
 class Character:
+    HURT_SOUND = "ow"
+    SCORE_SOUND = "score"
+
     def __init__(self) -> None:
         self.position: Vec2 = Vec2()
         self.velocity: Vec2 = Vec2()
@@ -16,9 +18,6 @@ class Character:
         # self.renderer = PlayerRenderer()
         self.renderer = LuxRenderer()
 
-        self.hurt_sound = load_sound("ow")
-        self.score_sound = load_sound("score")
-
         self.invincibility_time = 1.0
         self._invicibility_timer = self.invincibility_time
 
@@ -1,211 +1,24 @@
-import math
 import arcade
-from jam2025.core.game.bullet import BasicBullet, BossBullet, BulletEmitter, BulletEvent, BulletList, BulletPattern, RandomizedBulletEmitter, ScoreBullet
-from jam2025.core.game.enemy import BossEnemy, Enemy, InvisibleEnemy
-from jam2025.core.game.wave import BossWave, Keyframe, MotionPath, Wave
-from jam2025.core.settings import settings
+from jam2025.core.game.bullet import BulletList, BulletPattern
+from jam2025.core.game.content import load_content
+from jam2025.core.game.wave import Wave
 
 PATTERNS: dict[str, BulletPattern] = {}
 WAVES: dict[str, Wave] = {}
 
-dummy_bullet_list = BulletList()
-
-# ! HARDCODED BECAUSE FULLSCREEN STUFF
-width = 1920
-height = 1080
-center = (width / 2, height / 2)
-
-def load_constants() -> None:
-    PATTERNS.update({
-        "right": BulletPattern(0.5, [BulletEvent(0, 1, 0)]),
-        "rightslow": BulletPattern(0.75, [BulletEvent(0, 1, 0)]),
-        "top": BulletPattern(0.5, [BulletEvent(0, 0, 1)]),
-        "bottom": BulletPattern(0.5, [BulletEvent(0, 0, -1)]),
-        "left": BulletPattern(0.5, [BulletEvent(0.25, -1, 0)]),
-        "leftslow": BulletPattern(0.75, [BulletEvent(0.33, -1, 0)]),
-        "fourwayslow": BulletPattern(0.75, [BulletEvent(0, 1, 0), BulletEvent(0, 0, 1), BulletEvent(0, 0, -1), BulletEvent(0, -1, 0)]),
-        "fourway": BulletPattern(0.5, [BulletEvent(0, 1, 0), BulletEvent(0, 0, 1), BulletEvent(0, 0, -1), BulletEvent(0, -1, 0)]),
-        "eightway": BulletPattern(0.5, [BulletEvent(0, 1, 0), BulletEvent(0, 0, 1), BulletEvent(0, 0, -1), BulletEvent(0, -1, 0),
-                                        BulletEvent(0, 1, 1), BulletEvent(0, -1, 1), BulletEvent(0, 1, -1), BulletEvent(0, -1, -1)]),
-        "eightwayfast": BulletPattern(0.33, [BulletEvent(0, 1, 0), BulletEvent(0, 0, 1), BulletEvent(0, 0, -1), BulletEvent(0, -1, 0),
-                                        BulletEvent(0, 1, 1), BulletEvent(0, -1, 1), BulletEvent(0, 1, -1), BulletEvent(0, -1, -1)]),
-        "16wayfast": BulletPattern(0.66, [BulletEvent(0, 1, 0), BulletEvent(0, 0, 1), BulletEvent(0, 0, -1), BulletEvent(0, -1, 0),
-                                        BulletEvent(0, 1, 1), BulletEvent(0, -1, 1), BulletEvent(0, 1, -1), BulletEvent(0, -1, -1),
-                                        BulletEvent(0.33, 1 / 2, 0 / 2), BulletEvent(0.33, 0 / 2, 1 / 2), BulletEvent(0.33, 0 / 2, -1 / 2), BulletEvent(0.33, -1 / 2, 0 / 2),
-                                        BulletEvent(0.33, 1 / 2, 1 / 2), BulletEvent(0.33, -1 / 2, 1 / 2), BulletEvent(0.33, 1 / 2, -1 / 2), BulletEvent(0.33, -1 / 2, -1 / 2)]),
-        "fourwayspin": BulletPattern(0.5, [BulletEvent(0, 1, 0, radius = 200),
-                                        BulletEvent(0, 0, 1, radius = 200),
-                                        BulletEvent(0, 0, -1, radius = 200),
-                                        BulletEvent(0, -1, 0, radius = 200)]),
-        "fourwaystagger": BulletPattern(0.8, [BulletEvent(0, 0, 1),
-                                            BulletEvent(0.2, 0, 0),
-                                            BulletEvent(0.4, 0, -1),
-                                            BulletEvent(0.6, -1, 0)]),
-        "chaos": BulletPattern(
-            math.pi,
-            [
-                BulletEvent(0*math.pi/7,  math.cos(0*math.tau/7),  math.sin(0*math.tau/7)),
-                BulletEvent(0*math.pi/7, -math.cos(0*math.tau/7), -math.sin(0*math.tau/7)),
-                BulletEvent(0*math.pi/7, -math.sin(0*math.tau/7),  math.cos(0*math.tau/7)),
-                BulletEvent(0*math.pi/7,  math.sin(0*math.tau/7), -math.cos(0*math.tau/7)),
-                BulletEvent(1*math.pi/7,  math.cos(1*math.tau/7),  math.sin(1*math.tau/7)),
-                BulletEvent(1*math.pi/7, -math.cos(1*math.tau/7), -math.sin(1*math.tau/7)),
-                BulletEvent(1*math.pi/7, -math.sin(1*math.tau/7),  math.cos(1*math.tau/7)),
-                BulletEvent(1*math.pi/7,  math.sin(1*math.tau/7), -math.cos(1*math.tau/7)),
-                BulletEvent(2*math.pi/7,  math.cos(2*math.tau/7),  math.sin(2*math.tau/7)),
-                BulletEvent(2*math.pi/7, -math.cos(2*math.tau/7), -math.sin(2*math.tau/7)),
-                BulletEvent(2*math.pi/7, -math.sin(2*math.tau/7),  math.cos(2*math.tau/7)),
-                BulletEvent(2*math.pi/7,  math.sin(2*math.tau/7), -math.cos(2*math.tau/7)),
-                BulletEvent(3*math.pi/7,  math.cos(3*math.tau/7),  math.sin(3*math.tau/7)),
-                BulletEvent(3*math.pi/7, -math.cos(3*math.tau/7), -math.sin(3*math.tau/7)),
-                BulletEvent(3*math.pi/7, -math.sin(3*math.tau/7),  math.cos(3*math.tau/7)),
-                BulletEvent(3*math.pi/7,  math.sin(3*math.tau/7), -math.cos(3*math.tau/7)),
-                BulletEvent(4*math.pi/7,  math.cos(4*math.tau/7),  math.sin(4*math.tau/7)),
-                BulletEvent(4*math.pi/7, -math.cos(4*math.tau/7), -math.sin(4*math.tau/7)),
-                BulletEvent(4*math.pi/7, -math.sin(4*math.tau/7),  math.cos(4*math.tau/7)),
-                BulletEvent(4*math.pi/7,  math.sin(4*math.tau/7), -math.cos(4*math.tau/7)),
-                BulletEvent(5*math.pi/7,  math.cos(5*math.tau/7),  math.sin(5*math.tau/7)),
-                BulletEvent(5*math.pi/7, -math.cos(5*math.tau/7), -math.sin(5*math.tau/7)),
-                BulletEvent(5*math.pi/7, -math.sin(5*math.tau/7),  math.cos(5*math.tau/7)),
-                BulletEvent(5*math.pi/7,  math.sin(5*math.tau/7), -math.cos(5*math.tau/7)),
-                BulletEvent(6*math.pi/7,  math.cos(6*math.tau/7),  math.sin(6*math.tau/7)),
-                BulletEvent(6*math.pi/7, -math.cos(6*math.tau/7), -math.sin(6*math.tau/7)),
-                BulletEvent(6*math.pi/7, -math.sin(6*math.tau/7),  math.cos(6*math.tau/7)),
-                BulletEvent(6*math.pi/7,  math.sin(6*math.tau/7), -math.cos(6*math.tau/7)),
-            ]
-        )
-    })
+# The waves a game plays through, in order (then it loops).
+GAME_WAVES = ["rectangle", "left_and_right", "triangle", "boss",
+              "rectangle", "left_and_right", "triangle", "boss2"]
 
-    WAVES.update({
-        "rectangle": Wave(30, [
-            MotionPath(InvisibleEnemy(
-                BulletEmitter(center,
-                            dummy_bullet_list,
-                            ScoreBullet,
-                            PATTERNS["fourwayslow"])),
-            [Keyframe(0, (width * 0.25, height * 0.25)),
-            Keyframe(2.5, (width * 0.75, height * 0.25)),
-            Keyframe(5, (width * 0.75, height * 0.75)),
-            Keyframe(7.5, (width * 0.25, height * 0.75)),
-            Keyframe(10, (width * 0.25, height * 0.25))]),
-            MotionPath(Enemy(arcade.color.RED,
-                BulletEmitter(center,
-                            dummy_bullet_list,
-                            BasicBullet,
-                            PATTERNS["fourway"])),
-            [Keyframe(0, (width * 0.25, height * 0.25)),
-            Keyframe(2.5, (width * 0.75, height * 0.25)),
-            Keyframe(5, (width * 0.75, height * 0.75)),
-            Keyframe(7.5, (width * 0.25, height * 0.75)),
-            Keyframe(10, (width * 0.25, height * 0.25))])
-        ]),
-        "left_and_right": Wave(20, [
-            MotionPath(Enemy(arcade.color.RED,
-                BulletEmitter((640, 480),
-                            dummy_bullet_list,
-                            BasicBullet,
-                            PATTERNS["right"])),
-                    [Keyframe(0, (width * 0.1, height * 0.1)),
-                    Keyframe(1, (width * 0.1, height * 0.9)),
-                    Keyframe(2, (width * 0.1, height * 0.1))]),
-            MotionPath(Enemy(arcade.color.RED,
-                BulletEmitter((640, 480),
-                            dummy_bullet_list,
-                            BasicBullet,
-                            PATTERNS["left"])),
-                    [Keyframe(0, (width * 0.9, height * 0.1)),
-                    Keyframe(1, (width * 0.9, height * 0.9)),
-                    Keyframe(2, (width * 0.9, height * 0.1))]),
-            MotionPath(Enemy(arcade.color.GREEN,
-                BulletEmitter((640, 480),
-                            dummy_bullet_list,
-                            ScoreBullet,
-                            PATTERNS["rightslow"])),
-                    [Keyframe(0, (width * 0.1, height * 0.9)),
-                    Keyframe(1, (width * 0.1, height * 0.1)),
-                    Keyframe(2, (width * 0.1, height * 0.9))]),
-            MotionPath(Enemy(arcade.color.GREEN,
-                BulletEmitter((640, 480),
-                            dummy_bullet_list,
-                            ScoreBullet,
-                            PATTERNS["leftslow"])),
-                    [Keyframe(0, (width * 0.9, height * 0.9)),
-                    Keyframe(1, (width * 0.9, height * 0.1)),
-                    Keyframe(2, (width * 0.9, height * 0.9))])
-        ]),
-        "triangle": Wave(20, [
-            MotionPath(Enemy(arcade.color.RED, BulletEmitter(center,
-                                                             dummy_bullet_list,
-                                                             BasicBullet,
-                                                             PATTERNS["eightway"])),
-                        [
-                            Keyframe(0, (0, height)),
-                            Keyframe(1, (width, height)),
-                            Keyframe(2, (width / 2, 0)),
-                            Keyframe(3, (0, height))
-                        ]),
-            MotionPath(Enemy(arcade.color.RED, BulletEmitter(center,
-                                                             dummy_bullet_list,
-                                                             BasicBullet,
-                                                             PATTERNS["eightway"])),
-                        [
-                            Keyframe(0, (width / 2, height)),
-                            Keyframe(1, (width, 0)),
-                            Keyframe(2, (0, 0)),
-                            Keyframe(3, (width / 2, height))
-                        ]),
-            MotionPath(Enemy(arcade.color.GREEN, BulletEmitter(center,
-                                                             dummy_bullet_list,
-                                                             ScoreBullet,
-                                                             PATTERNS["fourwayslow"])),
-                        [
-                            Keyframe(0, center)
-                        ])
-        ]),
-        "boss": BossWave(600, [
-            MotionPath(Enemy(arcade.color.TRANSPARENT_BLACK,
-                BulletEmitter(center, dummy_bullet_list, ScoreBullet, PATTERNS["chaos"])),
-                    [Keyframe(0, center)]),
-            MotionPath(BossEnemy(
-                RandomizedBulletEmitter(center, 64, dummy_bullet_list, BossBullet, PATTERNS["16wayfast"])),
-                    [Keyframe(0, center)])],
-            25),
-        "boss2": BossWave(600, [
-            MotionPath(Enemy(arcade.color.TRANSPARENT_BLACK,
-                BulletEmitter(center, dummy_bullet_list, ScoreBullet, PATTERNS["chaos"])),
-                    [Keyframe(0, center)]),
-            MotionPath(BossEnemy(
-                RandomizedBulletEmitter(center, 64, dummy_bullet_list, BossBullet, PATTERNS["16wayfast"])),
-                    [Keyframe(0, center)]),
-            MotionPath(Enemy(arcade.color.RED,
-                BulletEmitter((640, 480),
-                            dummy_bullet_list,
-                            BasicBullet,
-                            PATTERNS["right"])),
-                    [Keyframe(0, (width * 0.1, height * 0.1)),
-                    Keyframe(1, (width * 0.1, height * 0.9)),
-                    Keyframe(2, (width * 0.1, height * 0.1))]),
-            MotionPath(Enemy(arcade.color.RED,
-                BulletEmitter((640, 480),
-                            dummy_bullet_list,
-                            BasicBullet,
-                            PATTERNS["left"])),
-                    [Keyframe(0, (width * 0.9, height * 0.1)),
-                    Keyframe(1, (width * 0.9, height * 0.9)),
-                    Keyframe(2, (width * 0.9, height * 0.1))])],
-            40)
-    })
-
-def resize_waves() -> None:
-    global WAVES, width, height
+dummy_bullet_list = BulletList()
 
-    new_width_ratio = settings.window_width / width
-    new_height_ratio = settings.window_width / width
+def load_constants(size: tuple[float, float] | None = None) -> None:
+    """Load every pattern and wave from data/content, laying waves out for `size` (the window size by default).
 
-    for w in WAVES.values():
-        for mp in w.motion_paths:
-            for k in mp.keyframes:
-                k.position = (k.position[0] * new_width_ratio, k.position[1] * new_height_ratio)
+    Call it again with a new size to rebuild the waves for it."""
+    patterns, waves = load_content(dummy_bullet_list, size or arcade.get_window().size)
+    PATTERNS.update(patterns)
+    WAVES.update(waves)
 
-    width = settings.webcam_width
-    height = settings.webcam_height
+def game_waves() -> list[Wave]:
+    return [WAVES[name] for name in GAME_WAVES]
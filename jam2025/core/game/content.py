@@ -0,0 +1,275 @@
+"""
+Bullet patterns and waves, loaded from the TOML files in data/content.
+
+Each file is validated and compiled (patterns into arrays, keyframes into screen fractions) once, and
+the result is pickled to the user cache directory keyed by a hash of the file, so starting the game only parses
+files that changed. Turning the compiled data into live objects (enemies, emitters, scaled keyframes)
+happens every load, since that needs a window and depends on its size.
+"""
+import hashlib
+import math
+import pickle
+from tomllib import TOMLDecodeError, loads
+from typing import Any
+
+import arcade
+import numpy as np
+
+from jam2025.core.game.bullet import AimedBulletEmitter, BasicBullet, BossBullet, Bullet, BulletEmitter, BulletList, BulletPattern, RainbowBullet, RandomizedBulletEmitter, ScoreBullet
+from jam2025.core.game.enemy import BossEnemy, Enemy, InvisibleEnemy
+from jam2025.core.game.pattern_generators import GENERATORS
+from jam2025.core.game.wave import BossWave, Keyframe, MotionPath, Wave
+from jam2025.data.loading import load_content as _load_files
+from jam2025.lib import anim
+from jam2025.lib.utils import user_cache_dir
+
+# Bump whenever the compiled format (or what a generator makes) changes, so stale cache entries are ignored.
+CACHE_VERSION = 3
+CACHE_PATH = user_cache_dir('content')
+
+BULLET_TYPES: dict[str, type[Bullet]] = {t.__name__: t for t in (Bullet, BasicBullet, ScoreBullet, RainbowBullet, BossBullet)}
+ENEMY_TYPES = ("enemy", "invisible", "boss")
+MOTION_MODES = ("linear", "spline")
+EMITTER_TYPES = ("basic", "randomized", "aimed")
+
+type CompiledPattern = dict[str, Any]
+type CompiledWave = dict[str, Any]
+type CompiledContent = tuple[dict[str, CompiledPattern], dict[str, CompiledWave]]
+
+
+def _get(table: dict, key: str, kind: type | tuple[type, ...], where: str, default: Any = ...) -> Any:
+    if key not in table:
+        if default is ...:
+            raise ValueError(f"{where}: missing '{key}'")
+        return default
+    value = table[key]
+    # TOML booleans are ints to isinstance, but never valid numbers here.
+    if isinstance(value, bool) and bool not in (kind if isinstance(kind, tuple) else (kind,)):
+        raise ValueError(f"{where}: '{key}' should not be a boolean")
+    if not isinstance(value, kind):
+        raise ValueError(f"{where}: '{key}' has the wrong type ({type(value).__name__})")
+    return value
+
+def _check_keys(table: dict, allowed: set[str], where: str) -> None:
+    unknown = set(table) - allowed
+    if unknown:
+        raise ValueError(f"{where}: unknown key(s) {', '.join(sorted(unknown))}")
+
+def _compile_pattern(table: Any, where: str) -> CompiledPattern:
+    if not isinstance(table, dict):
+        raise ValueError(f"{where}: should be a table")
+    _check_keys(table, {"loop", "events", "generators"}, where)
+    loop = float(_get(table, "loop", (int, float), where))
+    if loop <= 0:
+        raise ValueError(f"{where}: 'loop' has to be positive")
+
+    times, directions, speeds, radii = [], [], [], []
+    for i, event in enumerate(_get(table, "events", list, where, [])):
+        at = f"{where}.events[{i}]"
+        if not isinstance(event, dict):
+            raise ValueError(f"{at}: should be a table")
+        _check_keys(event, {"time", "direction", "angle", "speed", "radius"}, at)
+        time = float(_get(event, "time", (int, float), at))
+        if not 0 <= time < loop:
+            raise ValueError(f"{at}: 'time' has to be within [0, loop)")
+        if ("direction" in event) == ("angle" in event):
+            raise ValueError(f"{at}: needs exactly one of 'direction' or 'angle'")
+        if "angle" in event:
+            angle = math.radians(_get(event, "angle", (int, float), at))
+            direction = (math.cos(angle), math.sin(angle))
+        else:
+            direction = _get(event, "direction", list, at)
+            if len(direction) != 2 or not all(isinstance(d, (int, float)) and not isinstance(d, bool) for d in direction):
+                raise ValueError(f"{at}: 'direction' should be two numbers")
+        times.append(time)
+        directions.append(direction)
+        speeds.append(float(_get(event, "speed", (int, float), at, 100)))
+        radii.append(float(_get(event, "radius", (int, float), at, 0)))
+
+    order = np.argsort(np.asarray(times, np.float64), kind = "stable")
+    directions_arr = np.asarray(directions, np.float64).reshape(-1, 2)
+    lengths = np.hypot(directions_arr[:, 0], directions_arr[:, 1])[:, None]
+    directions_arr = np.divide(directions_arr, lengths, out = np.zeros_like(directions_arr), where = lengths > 0)
+    pattern = BulletPattern.from_arrays(
+        loop,
+        np.asarray(times, np.float64)[order],
+        directions_arr[order],
+        np.asarray(speeds, np.float64)[order],
+        np.asarray(radii, np.float64)[order]
+    )
+
+    for i, generator in enumerate(_get(table, "generators", list, where, [])):
+        at = f"{where}.generators[{i}]"
+        if not isinstance(generator, dict):
+            raise ValueError(f"{at}: should be a table")
+        kind = _get(generator, "kind", str, at)
+        if kind not in GENERATORS:
+            raise ValueError(f"{at}: unknown generator '{kind}' (expected one of {', '.join(GENERATORS)})")
+        params = {k: tuple(v) if isinstance(v, list) else v for k, v in generator.items() if k != "kind"}
+        try:
+            pattern = pattern.mix(GENERATORS[kind](loop, **params))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{at}: {e}") from e
+
+    if not len(pattern.times):
+        raise ValueError(f"{where}: needs at least one event or generator")
+    return {
+        "loop": loop,
+        "times": pattern.times,
+        "directions": pattern.directions,
+        "speeds": pattern.speeds,
+        "radii": pattern.radii
+    }
+
+def _compile_path(table: Any, where: str) -> dict[str, Any]:
+    if not isinstance(table, dict):
+        raise ValueError(f"{where}: should be a table")
+    _check_keys(table, {"enemy", "color", "emitter", "spread", "bullet", "pattern", "keyframes", "loop", "motion", "easing"}, where)
+
+    enemy = _get(table, "enemy", str, where, "enemy")
+    if enemy not in ENEMY_TYPES:
+        raise ValueError(f"{where}: unknown enemy '{enemy}' (expected one of {', '.join(ENEMY_TYPES)})")
+    color = _get(table, "color", str, where, "RED")
+    if not isinstance(getattr(arcade.color, color, None), tuple):
+        raise ValueError(f"{where}: unknown color '{color}'")
+    emitter = _get(table, "emitter", str, where, "basic")
+    if emitter not in EMITTER_TYPES:
+        raise ValueError(f"{where}: unknown emitter '{emitter}' (expected one of {', '.join(EMITTER_TYPES)})")
+    bullet = _get(table, "bullet", str, where, "BasicBullet")
+    if bullet not in BULLET_TYPES:
+        raise ValueError(f"{where}: unknown bullet '{bullet}' (expected one of {', '.join(BULLET_TYPES)})")
+
+    keyframes = _get(table, "keyframes", list, where)
+    if not keyframes:
+        raise ValueError(f"{where}: needs at least one keyframe")
+    for i, k in enumerate(keyframes):
+        if not isinstance(k, list) or len(k) != 3 or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in k):
+            raise ValueError(f"{where}.keyframes[{i}]: should be [time, x, y]")
+    keyframes_arr = np.asarray(keyframes, np.float64)
+    if np.any(np.diff(keyframes_arr[:, 0]) <= 0):
+        raise ValueError(f"{where}: keyframe times have to be increasing")
+
+    motion = _get(table, "motion", str, where, "linear")
+    if motion not in MOTION_MODES:
+        raise ValueError(f"{where}: unknown motion '{motion}' (expected one of {', '.join(MOTION_MODES)})")
+    easing = _get(table, "easing", (str, list), where, None)
+    if isinstance(easing, list) and len(easing) != len(keyframes) - 1:
+        raise ValueError(f"{where}: 'easing' needs one name per segment ({len(keyframes) - 1}), got {len(easing)}")
+    for name in easing if isinstance(easing, list) else [easing] if easing is not None else []:
+        if not isinstance(name, str) or not callable(getattr(anim, f"ease_{name}", None)):
+            raise ValueError(f"{where}: unknown easing {name!r}")
+
+    return {
+        "enemy": enemy,
+        "color": color,
+        "emitter": emitter,
+        "spread": float(_get(table, "spread", (int, float), where, 0)),
+        "bullet": bullet,
+        "pattern": _get(table, "pattern", str, where),
+        "keyframes": keyframes_arr,
+        "loop": _get(table, "loop", bool, where, True),
+        "motion": motion,
+        "easing": easing
+    }
+
+def _compile_wave(table: Any, where: str) -> CompiledWave:
+    if not isinstance(table, dict):
+        raise ValueError(f"{where}: should be a table")
+    _check_keys(table, {"time", "bullets_needed", "paths"}, where)
+    bullets_needed = _get(table, "bullets_needed", int, where, None)
+    if bullets_needed is not None and bullets_needed <= 0:
+        raise ValueError(f"{where}: 'bullets_needed' has to be positive")
+    return {
+        "time": float(_get(table, "time", (int, float), where)),
+        "bullets_needed": bullets_needed,
+        "paths": [_compile_path(p, f"{where}.paths[{i}]") for i, p in enumerate(_get(table, "paths", list, where))]
+    }
+
+def compile_content(name: str, raw: bytes) -> CompiledContent:
+    """Validate one content file and compile it; raises ValueError saying where anything is wrong."""
+    try:
+        toml = loads(raw.decode())
+    except (UnicodeDecodeError, TOMLDecodeError) as e:
+        raise ValueError(f"{name}: {e}") from e
+    _check_keys(toml, {"patterns", "waves"}, name)
+
+    patterns = {key: _compile_pattern(value, f"{name}: patterns.{key}") for key, value in _get(toml, "patterns", dict, name, {}).items()}
+    waves = {key: _compile_wave(value, f"{name}: waves.{key}") for key, value in _get(toml, "waves", dict, name, {}).items()}
+    return patterns, waves
+
+def load_compiled(name: str, raw: bytes) -> CompiledContent:
+    """`compile_content`, going through the on-disk cache."""
+    digest = hashlib.sha256(CACHE_VERSION.to_bytes(4, "little") + raw).hexdigest()
+    path = CACHE_PATH / f"{digest}.pickle"
+    if path.exists():
+        try:
+            with open(path, 'rb') as fp:
+                return pickle.load(fp)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass  # Corrupt or unreadable; just compile it again.
+
+    compiled = compile_content(name, raw)
+    try:
+        path.parent.mkdir(parents = True, exist_ok = True)
+        with open(path, 'wb') as fp:
+            pickle.dump(compiled, fp)
+    except OSError:
+        pass  # The cache is only a speedup.
+    return compiled
+
+def _build_wave(name: str, wave: CompiledWave, patterns: dict[str, BulletPattern], bullet_list: BulletList, size: tuple[float, float]) -> Wave:
+    scale = np.asarray(size, np.float64)
+    motion_paths = []
+    for i, path in enumerate(wave["paths"]):
+        if path["pattern"] not in patterns:
+            raise ValueError(f"waves.{name}.paths[{i}]: unknown pattern '{path['pattern']}'")
+        pattern = patterns[path["pattern"]]
+        positions = path["keyframes"][:, 1:] * scale
+        start = (float(positions[0, 0]), float(positions[0, 1]))
+        bullet_type = BULLET_TYPES[path["bullet"]]
+
+        if path["emitter"] == "randomized":
+            emitter: BulletEmitter = RandomizedBulletEmitter(start, path["spread"], bullet_list, bullet_type, pattern)
+        elif path["emitter"] == "aimed":
+            emitter = AimedBulletEmitter(start, bullet_list, bullet_type, pattern)
+        else:
+            emitter = BulletEmitter(start, bullet_list, bullet_type, pattern)
+
+        if path["enemy"] == "boss":
+            enemy: Enemy = BossEnemy(emitter)
+        elif path["enemy"] == "invisible":
+            enemy = InvisibleEnemy(emitter)
+        else:
+            enemy = Enemy(getattr(arcade.color, path["color"]), emitter)
+
+        keyframes = [Keyframe(float(t), (float(x), float(y))) for t, (x, y) in zip(path["keyframes"][:, 0], positions, strict = True)]
+        easing = path["easing"]
+        if isinstance(easing, list):
+            easing = [getattr(anim, f"ease_{e}") for e in easing]
+        elif easing is not None:
+            easing = getattr(anim, f"ease_{easing}")
+        motion_paths.append(MotionPath(enemy, keyframes, path["loop"], path["motion"], easing))
+
+    if wave["bullets_needed"] is not None:
+        return BossWave(wave["time"], motion_paths, wave["bullets_needed"])
+    return Wave(wave["time"], motion_paths)
+
+def load_content(bullet_list: BulletList, size: tuple[float, float]) -> tuple[dict[str, BulletPattern], dict[str, Wave]]:
+    """Every pattern and wave in data/content, with wave layouts scaled to `size` (usually the window size)."""
+    compiled_patterns: dict[str, CompiledPattern] = {}
+    compiled_waves: dict[str, CompiledWave] = {}
+    for name, raw in _load_files().items():
+        file_patterns, file_waves = load_compiled(name, raw)
+        for key in file_patterns.keys() & compiled_patterns.keys():
+            raise ValueError(f"{name}: pattern '{key}' is already defined")
+        for key in file_waves.keys() & compiled_waves.keys():
+            raise ValueError(f"{name}: wave '{key}' is already defined")
+        compiled_patterns.update(file_patterns)
+        compiled_waves.update(file_waves)
+
+    patterns = {
+        key: BulletPattern.from_arrays(p["loop"], p["times"], p["directions"], p["speeds"], p["radii"])
+        for key, p in compiled_patterns.items()
+    }
+    waves = {key: _build_wave(key, w, patterns, bullet_list, size) for key, w in compiled_waves.items()}
+    return patterns, waves
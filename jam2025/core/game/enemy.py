@@ -1,7 +1,6 @@
 from arcade import SpriteList, TextureAnimationSprite, Vec2
 import arcade
 from arcade.types import Color
-from arcade.clock import GLOBAL_CLOCK
 from jam2025.core.game.bullet import BulletEmitter
 from jam2025.core.game.lux import LuxRenderer
 from jam2025.core.settings import settings
@@ -29,7 +28,7 @@ class Enemy:
 
     @position.setter
     def position(self, v: Vec2) -> None:
-        delta_time = GLOBAL_CLOCK.delta_time
+        delta_time = self.emitter.clock.delta_time
         dx = (v[0] - self.position[0]) / delta_time
         dy = (v[1] - self.position[1]) / delta_time
         self.velocity = Vec2(dx, dy)
@@ -5,9 +5,11 @@ import arcade.gl as gl
 from arcade.types import Point2, RGBOrA255, Color
 from pyglet.graphics import Batch
 from pyglet.shapes import Triangle
-from jam2025.lib.procedural_animator import ProceduralAnimator, SecondOrderAnimator
+from jam2025.lib.procedural_animator import ProceduralAnimator, SecondOrderAnimator, k_values, second_order_step
+from jam2025.lib.shader_cache import ShaderSource, get_shader_cache, register
 from pyglet.math import Vec2
 from logging import getLogger
+from weakref import finalize
 
 logger = getLogger("jam2025")
 
@@ -105,14 +107,31 @@ class PlayerRenderer:
     def draw(self) -> None:
         self.bubble.draw(arcade.color.WHITE)
 
-class LuxRenderer:
+LUX_VERTEX_DTYPE = np.dtype([("position", np.float32, 2), ("color", np.uint8, 4)])
+# Each blob is a fan of triangles around its first point.
+FAN_INDICES = np.asarray([(0, (i+1), i) for i in range(1, BUBBLE_COUNT-1)], dtype=np.int32).ravel()
+# Where each of a blob's points sits around its centre, for a radius of 1.
+DIRECTIONS = np.asarray([(np.cos(a), np.sin(a)) for a in np.linspace(0, 2*np.pi, BUBBLE_COUNT, endpoint=False)])
+
+class LuxBatch:
+    """Animates and draws every lux blob in one go.
+
+    Each LuxRenderer gets a slot in (blobs, BUBBLE_COUNT, 2) state arrays. `LuxRenderer.update` just
+    records the renderer's position, velocity and delta time; `update` then steps every requested
+    blob's second order animator together, in place, and leaves the points in a float32 staging array.
+    `LuxRenderer.draw` only queues its slot; `flush` gathers the queued blobs in one take, uploads them
+    in a single buffer write and draws them with one call.
+
+    Steps also happen by themselves when a renderer is updated twice without one, or on `flush`, so
+    `update` only has to be called to decide where the work lands."""
+
     FRAGMENT_SHADER = r"""#version 330
-uniform vec4 in_colour;
+in vec4 vs_colour;
 
 out vec4 fs_colour;
 
 void main(){
-    fs_colour = in_colour;
+    fs_colour = vs_colour;
 }
 """
     VERTEX_SHADER = r"""#version 330
@@ -122,66 +141,226 @@ uniform WindowBlock {
 } window;
 
 in vec2 in_position;
+in vec4 in_colour;
+
+out vec4 vs_colour;
 
 void main(){
+    vs_colour = in_colour;
     gl_Position = window.projection * window.view * vec4(in_position, 0.0, 1.0);
 }
 """
 
-    def __init__(self, color: RGBOrA255 = (255, 255, 255, 255), radius: float = 16.0) -> None:
+    PROGRAM = register(ShaderSource(VERTEX_SHADER, FRAGMENT_SHADER))
+
+    def __init__(self, capacity: int = 32) -> None:
+        self.slots = 0
+        self._free: list[int] = []
+        self._requests: list[tuple[int, float, float, float, float, float]] = []
+        self._requested: set[int] = set()
+        self._allocate(capacity)
+
+        self._queued: list[int] = []
+        self.data = np.zeros((capacity, BUBBLE_COUNT), LUX_VERTEX_DTYPE)
+
+        # Made on the first flush, since renderers (and so the batch) get made before there is a window.
+        self._program: gl.Program | None = None
+        self._vertices: gl.Buffer | None = None
+        self._geometry: gl.Geometry | None = None
+        self._capacity = 0
+
+    def _allocate(self, capacity: int) -> None:
+        old = getattr(self, "staging", None)
+        self.capacity = capacity
+        points = (capacity, BUBBLE_COUNT, 2)
+        weights = (capacity, BUBBLE_COUNT, 1)
+        self.positions = self._resized("positions", (capacity, 2))
+        self.velocities = self._resized("velocities", (capacity, 2))
+        self.offsets = self._resized("offsets", points)
+        # The animator: previous target, position and velocity of every point.
+        self.xp = self._resized("xp", points)
+        self.y = self._resized("y", points)
+        self.dy = self._resized("dy", points)
+        self.staging = np.zeros((capacity, BUBBLE_COUNT), LUX_VERTEX_DTYPE)
+        if old is not None:
+            self.staging[:len(old)] = old
+        self._staging_positions = self.staging["position"]
+
+        # Scratch space, so a step doesn't allocate.
+        self._dt = np.zeros((capacity, 1, 1))
+        self._inverse_dt = np.zeros((capacity, 1, 1))
+        self._norm = np.zeros((capacity, 1))
+        self._direction = np.zeros((capacity, 2, 1))
+        self._dx = np.zeros(points)
+        self._scratch = np.zeros(points)
+        self._dot = np.zeros(weights)
+
+    def _resized(self, name: str, shape: tuple[int, ...]) -> np.ndarray:
+        array = np.zeros(shape)
+        old: np.ndarray | None = getattr(self, name, None)
+        if old is not None:
+            array[:len(old)] = old
+        return array
+
+    def add(self, radius: float, color: RGBOrA255) -> int:
+        """Claim a slot for a new blob at the origin; returns it."""
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self.slots == self.capacity:
+                self._allocate(self.capacity * 2)
+            slot = self.slots
+            self.slots += 1
+        self.offsets[slot] = radius * DIRECTIONS
+        self.staging[slot]["color"] = color
+        self.reset(slot)
+        return slot
+
+    def release(self, slot: int) -> None:
+        self._requests = [r for r in self._requests if r[0] != slot]
+        self._requested.discard(slot)
+        self._queued = [s for s in self._queued if s != slot]
+        self._free.append(slot)
+
+    def reset(self, slot: int) -> None:
+        """Put a blob back at rest around the origin."""
+        self._requests = [r for r in self._requests if r[0] != slot]
+        self._requested.discard(slot)
+        self.positions[slot] = 0
+        self.velocities[slot] = 0
+        self.xp[slot] = self.y[slot] = self.offsets[slot]
+        self.dy[slot] = 0
+        self._staging_positions[slot] = self.offsets[slot]
+
+    def set_color(self, slot: int, color: RGBOrA255) -> None:
+        self.staging[slot]["color"] = color
+
+    def request(self, slot: int, position: Point2, velocity: Point2, dt: float) -> None:
+        """Step this blob towards `position` on the next `update`."""
+        if slot in self._requested:
+            # Still waiting on the last step; it has to happen first.
+            self.update()
+        self._requests.append((slot, position[0], position[1], velocity[0], velocity[1], dt))
+        self._requested.add(slot)
+
+    def update(self) -> None:
+        """Step every blob that was requested since the last step, all at once.
+
+        This is SecondOrderAnimator's update per point (`second_order_step`), with damping LOCUS_POS_DAMP
+        and the frequency and response each blob's `update_values` used to set."""
+        if not self._requests:
+            return
+        requests = np.asarray(self._requests)
+        self._requests.clear()
+        self._requested.clear()
+        slots = requests[:, 0].astype(np.intp)
+        self.positions[slots] = requests[:, 1:3]
+        self.velocities[slots] = requests[:, 3:5]
+
+        # Blobs that weren't requested get a dt of 0, which leaves them exactly where they were.
+        n = self.slots
+        dt, inverse_dt = self._dt[:n], self._inverse_dt[:n]
+        dt.fill(0)
+        dt[slots, 0, 0] = requests[:, 5]
+        inverse_dt.fill(0)
+        inverse_dt[slots, 0, 0] = 1 / requests[:, 5]
+        xp, y, dy, dx, scratch, dot = self.xp[:n], self.y[:n], self.dy[:n], self._dx[:n], self._scratch[:n], self._dot[:n]
+
+        # Points facing the way the blob moves get a stiffer, overshooting spring; the ones behind it lag.
+        velocities, norm, direction = self.velocities[:n], self._norm[:n], self._direction[:n, :, 0]
+        np.hypot(velocities[:, 0:1], velocities[:, 1:2], out = norm)
+        np.copyto(direction, velocities)
+        np.divide(velocities, norm, out = direction, where = norm > 0)
+        np.matmul(DIRECTIONS, self._direction[:n], out = dot)
+
+        # frequency = 3 (0.5 dot + 0.5) + 3, response = dot.
+        k1, k2, k3 = k_values(1.5 * dot + 4.5, LOCUS_POS_DAMP, dot)
+
+        # The previous target is only the same as the new one for blobs that weren't requested.
+        np.subtract(self.positions[:n, None, :], xp, out = dx)
+        dx += self.offsets[:n]
+        dx *= inverse_dt
+        np.add(self.positions[:n, None, :], self.offsets[:n], out = xp)
+
+        second_order_step(dt, xp, dx, y, dy, k1, k2, k3, scratch)
+
+        np.copyto(self._staging_positions[:n], y, casting = "same_kind")
+
+    def queue(self, slot: int) -> None:
+        """Draw this blob on the next flush."""
+        self._queued.append(slot)
+
+    def _build(self) -> None:
+        ctx = arcade.get_window().ctx
+        if self._program is None:
+            self._program = get_shader_cache(ctx).program(LuxBatch.PROGRAM)
+        self._capacity = len(self.data)
+        indices = FAN_INDICES + BUBBLE_COUNT * np.arange(self._capacity, dtype=np.int32)[:, None]
+        self._vertices = ctx.buffer(reserve=self.data.nbytes, usage="stream")
+        self._geometry = ctx.geometry(
+            [gl.BufferDescription(self._vertices, '2f 4f1', ['in_position', 'in_colour'])],
+            index_buffer=ctx.buffer(data=indices.astype(np.int32).tobytes()),
+            mode=ctx.TRIANGLES
+        )
+
+    def clear(self) -> None:
+        self._queued.clear()
+
+    def flush(self) -> None:
+        """Draw everything queued since the last flush."""
+        count = len(self._queued)
+        if not count:
+            return
+        self.update()
+        if count > len(self.data):
+            self.data = np.zeros((max(count, len(self.data) * 2), BUBBLE_COUNT), LUX_VERTEX_DTYPE)
+        if self._geometry is None or self._capacity < len(self.data):
+            self._build()
+        assert self._vertices is not None
+        assert self._geometry is not None
+        assert self._program is not None
+        np.take(self.staging, self._queued, axis=0, out=self.data[:count])
+        self._vertices.write(self.data[:count])
+        self._geometry.render(self._program, vertices=count * len(FAN_INDICES))
+        self._queued.clear()
+
+lux_batch = LuxBatch()
+
+class LuxRenderer:
+    """One lux blob: a ring of points chasing its position, animated and drawn by a (shared) LuxBatch."""
+
+    def __init__(self, color: RGBOrA255 = (255, 255, 255, 255), radius: float = 16.0, batch: LuxBatch | None = None) -> None:
         self.position: Vec2 = Vec2()
         self.velocity: Vec2 = Vec2()
+        self._color = Color(*color)
+        self.batch = batch or lux_batch
+        self.slot = self.batch.add(radius, self._color)
+        finalize(self, self.batch.release, self.slot)
 
-        self._directions: np.typing.NDArray[np.float64] = np.asarray([(np.cos(a), np.sin(a)) for a in np.linspace(0, 2*np.pi, BUBBLE_COUNT, endpoint=False)])
-        self._offsets = radius * self._directions
-
-        vertices = [self.position] + self._offsets
-        self._animator: SecondOrderAnimator = (
-            SecondOrderAnimator(
-                np.ones((BUBBLE_COUNT, 1)) * LOCUS_POS_FREQ,
-                np.ones((BUBBLE_COUNT, 1)) * LOCUS_POS_DAMP,
-                np.ones((BUBBLE_COUNT, 1)) * LOCUS_POS_RESP,
-                vertices, vertices, np.zeros((BUBBLE_COUNT, 2))
-            )
-        )
+    @property
+    def color(self) -> Color:
+        return self._color
 
-        ctx = arcade.get_window().ctx
-        self._vertices: gl.Buffer = ctx.buffer(data=np.asarray(vertices, np.float32).tobytes())
-        self._geometry: gl.Geometry = ctx.geometry(
-            [gl.BufferDescription(self._vertices, '2f', ['in_position'])],
-            index_buffer=ctx.buffer(data=np.asarray([(0, (i+1), i) for i in range(1, BUBBLE_COUNT-1)], dtype=np.int32).tobytes()),
-            mode=ctx.TRIANGLES
-        )
-        self._program: gl.Program = ctx.program(
-            vertex_shader=LuxRenderer.VERTEX_SHADER,
-            fragment_shader=LuxRenderer.FRAGMENT_SHADER,
-        )
-        self._program['in_colour'] = Color(*color).normalized
+    @color.setter
+    def color(self, color: RGBOrA255) -> None:
+        self._color = Color(*color)
+        self.batch.set_color(self.slot, self._color)
+
+    @property
+    def points(self) -> np.ndarray:
+        """The blob's current (BUBBLE_COUNT, 2) outline."""
+        self.batch.update()
+        return self.batch.y[self.slot]
 
     def reset(self):
         self.position: Vec2 = Vec2()
         self.velocity: Vec2 = Vec2()
-        vertices = [self.position] + self._offsets
-        self._animator = (
-            SecondOrderAnimator(
-                np.ones((BUBBLE_COUNT, 1)) * LOCUS_POS_FREQ,
-                np.ones((BUBBLE_COUNT, 1)) * LOCUS_POS_DAMP,
-                np.ones((BUBBLE_COUNT, 1)) * LOCUS_POS_RESP,
-                vertices, vertices, np.zeros((BUBBLE_COUNT, 2))
-            )
-        )
-
-        self._vertices.write(vertices.tobytes())
+        self.batch.reset(self.slot)
 
     def update(self, dt: float) -> None:
-        dir = self.velocity.normalize()
-        dot = dir.x * self._directions[:, None, 0] + dir.y * self._directions[:, None, 1]
-        self._animator.update_values(new_frequency=3.0*(0.5*dot + 0.5) + 3.0, new_response=dot)
-
-        targets = [self.position] + self._offsets
-        vertices = self._animator.update(dt, targets)
-        self._vertices.write(np.asarray(vertices, np.float32).tobytes())
+        self.batch.request(self.slot, self.position, self.velocity, dt)
 
     def draw(self) -> None:
-        self._geometry.render(self._program)
-
+        """Queue this blob on its batch; it shows up when the batch is flushed."""
+        if self._color.a:
+            self.batch.queue(self.slot)
@@ -0,0 +1,68 @@
+"""
+Generators for the usual shapes of bullet pattern, built straight into pattern arrays.
+
+Angles are in degrees, counter-clockwise from the emitter's direction (which is to the right unless
+the emitter turns, e.g. AimedBulletEmitter). Combine generated patterns with `BulletPattern.mix`:
+
+    ring(0.5, 8).mix(ring(0.5, 8, time = 0.25, offset = 22.5))
+"""
+import numpy as np
+from numpy.typing import ArrayLike
+
+from jam2025.core.game.bullet import BulletPattern
+from jam2025.lib.typing import Seconds
+
+
+def from_angles(loop_time: Seconds, times: ArrayLike, angles: ArrayLike, speeds: ArrayLike = 100, radii: ArrayLike = 0) -> BulletPattern:
+    """A pattern from per-event times and angles (degrees); speeds and radii broadcast."""
+    times = np.asarray(times, np.float64)
+    if np.any((times < 0) | (times >= loop_time)):
+        raise ValueError("event times have to be within [0, loop_time)")
+    angles = np.radians(np.broadcast_to(np.asarray(angles, np.float64), times.shape))
+    order = np.argsort(times, kind = "stable")
+    return BulletPattern.from_arrays(
+        loop_time,
+        times[order],
+        np.stack((np.cos(angles), np.sin(angles)), axis = 1)[order],
+        np.broadcast_to(np.asarray(speeds, np.float64), times.shape)[order],
+        np.broadcast_to(np.asarray(radii, np.float64), times.shape)[order]
+    )
+
+def ring(loop_time: Seconds, count: int, time: Seconds = 0, offset: float = 0, speed: float = 100, radius: float = 0) -> BulletPattern:
+    """`count` bullets evenly around a circle, all at `time`."""
+    angles = offset + np.arange(count) * (360 / count)
+    return from_angles(loop_time, np.full(count, time), angles, speed, radius)
+
+def spiral(loop_time: Seconds, steps: int, arms: int = 1, turns: float = 1, offset: float = 0, speed: float = 100, radius: float = 0) -> BulletPattern:
+    """`arms` evenly spaced streams fired `steps` times a loop, turning `turns` times around over the loop."""
+    step = np.repeat(np.arange(steps), arms)
+    arm = np.tile(np.arange(arms), steps)
+    angles = offset + step * (360 * turns / steps) + arm * (360 / arms)
+    return from_angles(loop_time, step * (loop_time / steps), angles, speed, radius)
+
+def fan(loop_time: Seconds, count: int, spread: float = 45, time: Seconds = 0, shots: int = 1, interval: Seconds = 0.1,
+        offset: float = 0, speed: float = 100, radius: float = 0) -> BulletPattern:
+    """`count` bullets spread over `spread` degrees centred on `offset`, fired `shots` times `interval` apart.
+
+    Aimed at the player when played by an AimedBulletEmitter."""
+    angles = offset + (np.linspace(-spread / 2, spread / 2, count) if count > 1 else np.zeros(1))
+    shot = np.repeat(np.arange(shots), count)
+    return from_angles(loop_time, time + shot * interval, np.tile(angles, shots), speed, radius)
+
+def spray(loop_time: Seconds, count: int, seed: int = 0, spread: float = 360, offset: float = 0,
+          speed: tuple[float, float] = (100, 100), radius: float = 0) -> BulletPattern:
+    """`count` bullets at random times, angles (within `spread` degrees of `offset`) and speeds.
+
+    The same seed always makes the same pattern."""
+    rng = np.random.default_rng(seed)
+    times = rng.uniform(0, loop_time, count)
+    angles = offset + rng.uniform(-spread / 2, spread / 2, count)
+    speeds = rng.uniform(speed[0], speed[1], count)
+    return from_angles(loop_time, times, angles, speeds, radius)
+
+GENERATORS = {
+    "ring": ring,
+    "spiral": spiral,
+    "fan": fan,
+    "spray": spray
+}
@@ -0,0 +1,154 @@
+"""
+Recording a game's input so the Simulation can play it back exactly.
+
+A replay file is a header (everything a Simulation needs to start the same game, including which
+bullet integrator ran it: the GPU one is close to the CPU one but not bit-for-bit), then the cursor
+for every tick as zlib-compressed chunks of float32 pairs (NaN for "no cursor"), then optionally the
+final tick count and score so a playback can be checked against it. The cursor the game actually
+uses is the float32 one, which is what makes the playback bit-for-bit.
+
+Chunks are compressed and written on a background thread, so recording costs a frame almost nothing.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from queue import SimpleQueue
+from threading import Thread
+import struct
+import zlib
+
+from arcade.types import Point2
+import numpy as np
+
+MAGIC = b"J25R"
+VERSION = 2
+END = b"END!"
+
+_MAGIC = struct.Struct("<4sH")
+# magic, version, tick rate, seed, kill multiplier, width, height, GPU bullets, length of the wave names
+_HEADER = struct.Struct("<4sHdqiII?H")
+# Version 1 had no integrator flag; those were all recorded on the CPU.
+_HEADER_V1 = struct.Struct("<4sHdqiIIH")
+_CHUNK = struct.Struct("<I")
+_RESULT = struct.Struct("<qq")
+
+@dataclass
+class ReplayHeader:
+    tick_rate: float
+    seed: int
+    kill_mult: int
+    size: tuple[int, int]
+    waves: list[str]
+    gpu_bullets: bool = False
+
+    def to_bytes(self) -> bytes:
+        names = ",".join(self.waves).encode()
+        return _HEADER.pack(MAGIC, VERSION, self.tick_rate, self.seed, self.kill_mult, *self.size, self.gpu_bullets, len(names)) + names
+
+@dataclass
+class Replay:
+    header: ReplayHeader
+    cursors: np.ndarray
+    """(ticks, 2) float32; rows of NaN had no cursor."""
+    ticks: int | None = None
+    score: int | None = None
+    """The recorded result, if the recording was closed with one."""
+
+    def cursor(self, tick: int) -> Point2 | None:
+        x, y = self.cursors[tick]
+        return None if np.isnan(x) else (float(x), float(y))
+
+class ReplayRecorder:
+    """Writes one game's per-tick cursors to `path`, `chunk_ticks` at a time."""
+
+    def __init__(self, path: Path | str, header: ReplayHeader, chunk_ticks: int = 1024) -> None:
+        self.path = Path(path)
+        self.header = header
+        self._buffer = np.empty((chunk_ticks, 2), np.float32)
+        self._count = 0
+        self.ticks = 0
+        self.closed = False
+
+        self.path.parent.mkdir(parents = True, exist_ok = True)
+        self._queue: SimpleQueue[bytes | np.ndarray | None] = SimpleQueue()
+        self._thread = Thread(target = self._write, name = f"replay {self.path.name}", daemon = True)
+        self._thread.start()
+        self._queue.put(header.to_bytes())
+
+    def _write(self) -> None:
+        with open(self.path, 'wb') as fp:
+            while (item := self._queue.get()) is not None:
+                if isinstance(item, np.ndarray):
+                    data = zlib.compress(item.tobytes())
+                    fp.write(_CHUNK.pack(len(data)) + data)
+                else:
+                    fp.write(item)
+
+    def record(self, cursor: Point2 | None) -> Point2 | None:
+        """Store this tick's cursor; returns it as stored, which is what the game has to use."""
+        row = self._buffer[self._count]
+        if cursor is None:
+            row[:] = np.nan
+            stored = None
+        else:
+            row[:] = cursor
+            stored = (float(row[0]), float(row[1]))
+        self._count += 1
+        self.ticks += 1
+        if self._count == len(self._buffer):
+            self._flush()
+        return stored
+
+    def _flush(self) -> None:
+        if self._count:
+            self._queue.put(self._buffer[:self._count].copy())
+            self._count = 0
+
+    def close(self, score: int | None = None) -> None:
+        """Finish the file (with the final score, if the game has one) and wait for it to be written."""
+        if self.closed:
+            return
+        self.closed = True
+        self._flush()
+        if score is not None:
+            self._queue.put(_CHUNK.pack(0) + END + _RESULT.pack(self.ticks, score))
+        self._queue.put(None)
+        self._thread.join()
+
+def load_replay(path: Path | str) -> Replay:
+    raw = Path(path).read_bytes()
+    if len(raw) < _MAGIC.size:
+        raise ValueError(f"{path}: too short to be a replay")
+    magic, version = _MAGIC.unpack_from(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a replay")
+    if version not in (1, VERSION):
+        raise ValueError(f"{path}: replay version {version}, expected {VERSION}")
+    layout = _HEADER if version == VERSION else _HEADER_V1
+    if len(raw) < layout.size:
+        raise ValueError(f"{path}: too short to be a replay")
+    if version == VERSION:
+        _, _, tick_rate, seed, kill_mult, width, height, gpu_bullets, name_length = layout.unpack_from(raw)
+    else:
+        _, _, tick_rate, seed, kill_mult, width, height, name_length = layout.unpack_from(raw)
+        gpu_bullets = False
+    offset = layout.size
+    names = raw[offset:offset + name_length].decode()
+    offset += name_length
+    header = ReplayHeader(tick_rate, seed, kill_mult, (width, height), names.split(",") if names else [], gpu_bullets)
+
+    chunks = []
+    ticks = score = None
+    while offset + _CHUNK.size <= len(raw):
+        (length,) = _CHUNK.unpack_from(raw, offset)
+        offset += _CHUNK.size
+        if length == 0:
+            if raw[offset:offset + len(END)] == END:
+                ticks, score = _RESULT.unpack_from(raw, offset + len(END))
+            break
+        if offset + length > len(raw):
+            break  # Cut off mid-write (a crash, usually); keep everything before it.
+        chunks.append(np.frombuffer(zlib.decompress(raw[offset:offset + length]), np.float32).reshape(-1, 2))
+        offset += length
+
+    cursors = np.concatenate(chunks) if chunks else np.zeros((0, 2), np.float32)
+    return Replay(header, cursors, ticks, score)
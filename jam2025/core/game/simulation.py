@@ -0,0 +1,129 @@
+from arcade import Vec2
+from arcade.clock import Clock
+from arcade.types import Point2
+import numpy as np
+
+from jam2025.core.game.bullet import BulletList
+from jam2025.core.game.bullet_integrator import GPUBulletIntegrator
+from jam2025.core.game.character import Character
+from jam2025.core.game.replay import Replay, ReplayRecorder
+from jam2025.core.game.score_tracker import ScoreTracker
+from jam2025.core.game.wave import Wave, WavePlayer
+from jam2025.lib.stage_timer import NULL_TIMER, StageTimer
+from jam2025.lib.typing import Seconds
+
+def _random_seed() -> int:
+    return int(np.random.SeedSequence().entropy % 2**63)  # type: ignore -- entropy is an int when not given one
+
+class Simulation:
+    """One game (character, score, waves and bullets) stepped in fixed ticks on its own clock.
+
+    Nothing in here reads GLOBAL_CLOCK, so a game plays out the same for the same input and seed
+    however it is driven: `advance` fits ticks into real frame times, `step` runs one tick as fast
+    as it can (for headless runs)."""
+
+    def __init__(self, waves: list[Wave], tick_rate: float = 120, seed: int | None = None, max_ticks_per_advance: int = 8,
+                 timer: StageTimer = NULL_TIMER, kill_mult: int = 1) -> None:
+        self.clock = Clock()
+        self.tick_rate = tick_rate
+        self.tick_time: Seconds = 1 / tick_rate
+        self.max_ticks_per_advance = max_ticks_per_advance
+        self.seed = seed if seed is not None else _random_seed()
+
+        self.character = Character()
+        self.score_tracker = ScoreTracker()
+        self.score_tracker.kill_mult = kill_mult
+        self.wave_player = WavePlayer(waves, self.character, self.score_tracker, self.clock)
+        self.timer = self.wave_player.timer = timer
+
+        self._accumulator: Seconds = 0.0
+        self._seed_emitters()
+
+        # Every tick's input goes through this, when recording.
+        self.recorder: ReplayRecorder | None = None
+        # And comes from this instead of the caller, when playing a replay back.
+        self.playback: Replay | None = None
+
+    @property
+    def bullet_list(self) -> BulletList:
+        return self.wave_player.bullet_list
+
+    @property
+    def gpu_bullets(self) -> bool:
+        """Whether bullets move on the GPU; fixed when the WavePlayer is made, from settings.gpu_bullets."""
+        return isinstance(self.bullet_list.integrator, GPUBulletIntegrator)
+
+    @property
+    def time(self) -> Seconds:
+        return self.clock.time
+
+    @property
+    def ticks(self) -> int:
+        return self.clock.ticks
+
+    @property
+    def game_over(self) -> bool:
+        return self.character.health <= 0
+
+    @property
+    def playback_finished(self) -> bool:
+        return self.playback is not None and self.ticks >= len(self.playback.cursors)
+
+    @property
+    def alpha(self) -> float:
+        """How far into the next tick real time is, for anything that wants to interpolate when drawing."""
+        return self._accumulator / self.tick_time
+
+    def _seed_emitters(self) -> None:
+        # Each emitter with an rng gets its own stream, so they don't depend on each other's update order.
+        for w, wave in enumerate(self.wave_player.waves):
+            for p, mp in enumerate(wave.motion_paths):
+                if hasattr(mp.enemy.emitter, "rng"):
+                    mp.enemy.emitter.rng = np.random.default_rng((self.seed, w, p))  # type: ignore -- I literally just hasattred this
+
+    def start(self) -> None:
+        self.wave_player.start()
+
+    def reset(self, seed: int | None = None) -> None:
+        """Back to before `start`, with a new seed (random unless given)."""
+        self.seed = seed if seed is not None else _random_seed()
+        # A fresh clock, so a reset game runs exactly like a new one (times are floats, magnitudes matter).
+        self.clock = self.wave_player.clock = self.bullet_list.clock = Clock()
+        self.character.reset()
+        self.score_tracker.reset()
+        self.wave_player.reset()
+        self._accumulator = 0.0
+        self.playback = None
+        self._seed_emitters()
+
+    def play(self, replay: Replay) -> None:
+        """Reset into `replay`'s game, to play it back; call `start` after, same as always.
+
+        The replay has to be of the same waves, tick rate, kill multiplier, size and bullet integrator; checking that is up to the caller."""
+        self.reset(replay.header.seed)
+        self.playback = replay
+
+    def step(self, cursor: Point2 | None = None) -> None:
+        """Run exactly one tick, with the character moved to `cursor` (if given, and not playing a replay)."""
+        if self.playback is not None:
+            cursor = self.playback.cursor(self.ticks) if not self.playback_finished else None
+        if self.recorder is not None:
+            cursor = self.recorder.record(cursor)
+        self.clock.tick(self.tick_time)
+        with self.timer("character"):
+            self.character.update(self.tick_time, Vec2(*cursor) if cursor is not None else None)
+        self.wave_player.update(self.tick_time)
+
+    def advance(self, delta_time: Seconds, cursor: Point2 | None = None) -> int:
+        """Run as many ticks as fit in the real time passed so far; returns how many ran.
+
+        Falling more than `max_ticks_per_advance` ticks behind drops the extra time rather than
+        trying to catch up (and falling further behind)."""
+        self._accumulator += delta_time
+        ticks = min(int(self._accumulator / self.tick_time), self.max_ticks_per_advance)
+        for _ in range(ticks):
+            if self.game_over or self.playback_finished:
+                break
+            self.step(cursor)
+        self._accumulator = min(self._accumulator - ticks * self.tick_time, self.tick_time)
+        return ticks
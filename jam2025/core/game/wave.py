@@ -1,15 +1,21 @@
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Self
+from typing import Literal, Self
 from collections.abc import Callable, Sequence
 from arcade import SpriteList, Vec2
 from arcade.types import Point2
-from arcade.clock import GLOBAL_CLOCK
+from arcade.clock import GLOBAL_CLOCK, Clock
+import numpy as np
 
-from jam2025.core.game.bullet import BulletList
+from jam2025.core.game.bullet import AimedBulletEmitter, BulletList
+from jam2025.core.game.bullet_integrator import GPUBulletIntegrator
 from jam2025.core.game.character import Character
 from jam2025.core.game.enemy import Enemy
+from jam2025.core.game.lux import lux_batch
 from jam2025.core.game.score_tracker import ScoreTracker
-from jam2025.lib.anim import lerp, perc
+from jam2025.core.settings import settings
+from jam2025.lib.anim import EasingFunction
+from jam2025.lib.stage_timer import NULL_TIMER, StageTimer
 from jam2025.lib.typing import Seconds
 
 @dataclass
@@ -18,52 +24,182 @@ class Keyframe:
     position: Point2
 
 type KeyframeList = list[Keyframe]
+type MotionMode = Literal["linear", "spline"]
 
 @dataclass
 class MotionPath:
+    """Moves an enemy through its keyframes, looping back to the start if `loop`.
+
+    * `mode`: `"linear"` goes straight between keyframes; `"spline"` is a Catmull-Rom curve through
+      them (closed, if the path loops and ends where it starts).
+    * `easing`: eases progress through each segment, one EasingFunction for all of them or one each.
+
+    Every segment is compiled into a cubic (plus its easing) when the path is made, so finding a
+    position is a lookup and one polynomial; call `compile` after editing the keyframes."""
     enemy: Enemy
     keyframes: KeyframeList
     loop: bool = True
+    mode: MotionMode = "linear"
+    easing: EasingFunction | Sequence[EasingFunction | None] | None = None
 
-    def update_position(self, time: Seconds) -> None:
-        if len(self.keyframes) == 1:
-            self.enemy.position = Vec2(*self.keyframes[0].position)
-            return
-        if time <= self.keyframes[0].time:
-            # We're before keyframe 1
-            self.enemy.position = Vec2(*self.keyframes[0].position)
-        elif time >= self.keyframes[-1].time:
+    def __post_init__(self) -> None:
+        self.compile()
+
+    def compile(self) -> None:
+        self.times = np.asarray([k.time for k in self.keyframes], np.float64)
+        self.positions = np.asarray([k.position for k in self.keyframes], np.float64).reshape(-1, 2)
+        durations = np.diff(self.times)
+        self.inverse_durations = np.divide(1.0, durations, out = np.zeros_like(durations), where = durations > 0)
+
+        # (segments, 4, 2): a + b u + c u^2 + d u^3, for u from 0 to 1 across the segment.
+        start, end = self.positions[:-1], self.positions[1:]
+        self.coefficients = np.zeros((len(durations), 4, 2))
+        self.coefficients[:, 0] = start
+        if self.mode == "linear":
+            self.coefficients[:, 1] = end - start
+        elif self.mode == "spline":
+            tangents = self._tangents(durations)
+            m0 = tangents[:-1] * durations[:, None]
+            m1 = tangents[1:] * durations[:, None]
+            self.coefficients[:, 1] = m0
+            self.coefficients[:, 2] = 3 * (end - start) - 2 * m0 - m1
+            self.coefficients[:, 3] = 2 * (start - end) + m0 + m1
+        else:
+            raise ValueError(f"Unknown motion mode {self.mode!r}")
+
+        if self.easing is None or callable(self.easing):
+            self.easings: list[EasingFunction | None] = [self.easing] * len(durations)
+        else:
+            self.easings = list(self.easing)
+            if len(self.easings) != len(durations):
+                raise ValueError(f"{len(self.easings)} easings for {len(durations)} segments")
+
+        # One path at a time, bisect on plain lists beats numpy's per-call overhead.
+        self._time_list: list[float] = self.times.tolist()
+        self._position_list: list[list[float]] = self.positions.tolist()
+        self._inverse_list: list[float] = self.inverse_durations.tolist()
+        self._coefficient_list: list[list[list[float]]] = self.coefficients.tolist()
+
+    def _tangents(self, durations: np.ndarray) -> np.ndarray:
+        """Velocity at each keyframe: Catmull-Rom (the slope between its neighbours) inside the path."""
+        p, t = self.positions, self.times
+        tangents = np.zeros_like(p)
+        spans = (t[2:] - t[:-2])[:, None]
+        np.divide(p[2:] - p[:-2], spans, out = tangents[1:-1], where = spans > 0)
+        if self.loop and len(p) > 2 and np.array_equal(p[0], p[-1]):
+            # A closed loop: the ends are the same point, so give them the same tangent.
+            span = durations[0] + durations[-1]
+            tangents[0] = tangents[-1] = (p[1] - p[-2]) / span if span > 0 else 0
+        elif len(p) > 1:
+            tangents[0] = (p[1] - p[0]) * (1 / durations[0] if durations[0] > 0 else 0)
+            tangents[-1] = (p[-1] - p[-2]) * (1 / durations[-1] if durations[-1] > 0 else 0)
+        return tangents
+
+    def position_at(self, time: Seconds) -> tuple[float, float]:
+        times = self._time_list
+        positions = self._position_list
+        if len(times) == 1:
+            return positions[0][0], positions[0][1]
+        if time >= times[-1]:
             # We're after the last keyframe
-            if self.loop:
-                time %= self.keyframes[-1].time
-            else:
-                self.enemy.position = Vec2(*self.keyframes[-1].position)
-                return
-
-        # Get the index we're within:
-        current_keyframe = Keyframe(0, (0, 0))
-        current_keyframe_index = 0
-        for i, k in enumerate(self.keyframes):
-            if k.time <= time:
-                current_keyframe = k
-                current_keyframe_index = i
-            else:
-                break
-        next_keyframe = self.keyframes[current_keyframe_index + 1]
-        current_x = lerp(current_keyframe.position[0], next_keyframe.position[0], perc(current_keyframe.time, next_keyframe.time, time))
-        current_y = lerp(current_keyframe.position[1], next_keyframe.position[1], perc(current_keyframe.time, next_keyframe.time, time))
-        self.enemy.position = Vec2(current_x, current_y)
+            if not self.loop or times[-1] <= 0:
+                return positions[-1][0], positions[-1][1]
+            time %= times[-1]
+        if time <= times[0]:
+            # We're before keyframe 1
+            return positions[0][0], positions[0][1]
+
+        i = bisect_right(times, time) - 1
+        u = min((time - times[i]) * self._inverse_list[i], 1.0)
+        ease = self.easings[i]
+        if ease is not None:
+            u = ease(0.0, 1.0, u)
+        (ax, ay), (bx, by), (cx, cy), (dx, dy) = self._coefficient_list[i]
+        return ((dx * u + cx) * u + bx) * u + ax, ((dy * u + cy) * u + by) * u + ay
+
+    def update_position(self, time: Seconds) -> None:
+        self.enemy.position = Vec2(*self.position_at(time))
 
     def mix(self, new_keyframes: KeyframeList) -> "MotionPath":
         kf = self.keyframes + new_keyframes
         kf.sort(key = lambda x: x.time)
-        return MotionPath(self.enemy, kf, self.loop)
+        # Per-segment easings don't line up with the new segments; a single easing still applies.
+        easing = self.easing if self.easing is None or callable(self.easing) else None
+        return MotionPath(self.enemy, kf, self.loop, self.mode, easing)
+
+def _constant(position: np.ndarray) -> np.ndarray:
+    """The coefficients of a segment that stays at `position`."""
+    coefficients = np.zeros((1, 4, 2))
+    coefficients[0, 0] = position
+    return coefficients
 
+class MotionPathBatch:
+    """Several motion paths' tables packed together, so all of them are evaluated in one go.
+
+    Each path's keyframe times are shifted past the previous path's, which makes the packed times one
+    sorted array a single searchsorted can look every path up in.
+
+    Below `VECTORIZE_FROM` paths numpy's per-call overhead costs more than it saves, so small
+    batches just loop over `position_at` (same results)."""
+
+    VECTORIZE_FROM = 32
+
+    def __init__(self, paths: Sequence[MotionPath]) -> None:
+        self.paths = list(paths)
+        counts = np.asarray([len(p.times) for p in self.paths], np.intp)
+        self.ends = np.cumsum(counts)
+        self.starts = self.ends - counts
+
+        raw_times = [p.times for p in self.paths]
+        self.first_times = np.asarray([t[0] for t in raw_times], np.float64)
+        self.last_times = np.asarray([t[-1] for t in raw_times], np.float64)
+        self.loops = np.asarray([p.loop and len(p.times) > 1 for p in self.paths], bool) & (self.last_times > 0)
+
+        span = (np.max(self.last_times - self.first_times) if self.paths else 0) + 1
+        self.shifts = np.arange(len(self.paths)) * span - self.first_times
+        self.times = np.concatenate(raw_times) if self.paths else np.zeros(0)
+        self.shifted_times = self.times + np.repeat(self.shifts, counts)
+        self.positions = np.concatenate([p.positions for p in self.paths]) if self.paths else np.zeros((0, 2))
+        # Padded per path so segment i of the packed arrays starts at keyframe i.
+        self.inverse_durations = np.concatenate([np.append(p.inverse_durations, 0.0) for p in self.paths]) if self.paths else np.zeros(0)
+        self.coefficients = np.concatenate([np.concatenate((p.coefficients, _constant(p.positions[-1]))) for p in self.paths]) if self.paths else np.zeros((0, 4, 2))
+        # Easing is a Python call per path, so only the paths that have any get it.
+        self._eased = [(row, p) for row, p in enumerate(self.paths) if any(e is not None for e in p.easings)]
+
+        self._wrap_times = np.where(self.last_times > 0, self.last_times, 1.0)
+        self._last_segments = np.maximum(self.starts, self.ends - 2)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def positions_at(self, time: Seconds) -> np.ndarray:
+        """(paths, 2) positions of every path at `time`; the same as each path's `position_at`."""
+        if len(self.paths) < self.VECTORIZE_FROM:
+            return np.asarray([p.position_at(time) for p in self.paths], np.float64).reshape(-1, 2)
+
+        t = np.where(self.loops & (time >= self.last_times), np.fmod(time, self._wrap_times), time)
+        np.clip(t, self.first_times, self.last_times, out = t)
+
+        segment = np.searchsorted(self.shifted_times, t + self.shifts, side = "right")
+        segment -= 1
+        np.clip(segment, self.starts, self._last_segments, out = segment)
+
+        u = (t - self.times[segment]) * self.inverse_durations[segment]
+        np.clip(u, 0.0, 1.0, out = u)
+        for row, path in self._eased:
+            ease = path.easings[min(segment[row] - self.starts[row], len(path.easings) - 1)]
+            if ease is not None:
+                u[row] = ease(0.0, 1.0, float(u[row]))
+
+        a, b, c, d = np.moveaxis(self.coefficients[segment], 1, 0)
+        u = u[:, None]
+        return ((d * u + c) * u + b) * u + a
 
 class Wave:
     def __init__(self, total_time: Seconds, motion_paths: Sequence[MotionPath], skip_condition: Callable[[Self, Character, ScoreTracker], bool] = lambda x, y, z: False):
         self.total_time = total_time
         self.motion_paths = motion_paths
+        self.path_batch = MotionPathBatch(motion_paths)
         self.skip_condition = skip_condition
 
 class BossWave(Wave):
@@ -73,7 +209,7 @@ class BossWave(Wave):
         super().__init__(total_time, motion_paths, skip_condition)
 
 class WavePlayer:
-    def __init__(self, waves: list[Wave], character: Character, score_tracker: ScoreTracker) -> None:
+    def __init__(self, waves: list[Wave], character: Character, score_tracker: ScoreTracker, clock: Clock | None = None) -> None:
         self.waves = waves
         self._waves = self.waves.copy()
 
@@ -82,15 +218,29 @@ class WavePlayer:
         self.character = character
         self.score_tracker = score_tracker
 
-        self.bullet_list = BulletList()
+        self.clock = clock or GLOBAL_CLOCK
+        self.bullet_list = BulletList(integrator = GPUBulletIntegrator() if settings.gpu_bullets else None, clock = self.clock)
         self.spritelist = SpriteList()
+        self._timer = NULL_TIMER
 
         for w in self.waves:
             for mp in w.motion_paths:
                 mp.enemy.emitter.bullet_list = self.bullet_list
+                if isinstance(mp.enemy.emitter, AimedBulletEmitter):
+                    mp.enemy.emitter.target = self.character
         self.playing = False
         self.strict = False
 
+    @property
+    def timer(self) -> StageTimer:
+        """Times each stage of `update` (and of the BulletList's update)."""
+        return self._timer
+
+    @timer.setter
+    def timer(self, timer: StageTimer) -> None:
+        self._timer = timer
+        self.bullet_list.timer = timer
+
     def start(self) -> None:
         self.playing = True
         self.next_wave()
@@ -98,13 +248,17 @@ class WavePlayer:
     def next_wave(self) -> None:
         if self._waves:
             self.current_wave = self._waves.pop(0)
-            self.current_wave_start_time = GLOBAL_CLOCK.time
+            self.current_wave_start_time = self.clock.time
         elif self.strict:
             raise RuntimeError("No more waves!")
         else:
             self._waves = self.waves.copy()
             self.current_wave = self._waves.pop(0)
-            self.current_wave_start_time = GLOBAL_CLOCK.time
+            self.current_wave_start_time = self.clock.time
+
+        self.bullet_list.prewarm(mp.enemy.emitter for mp in self.current_wave.motion_paths)
+        for mp in self.current_wave.motion_paths:
+            mp.enemy.emitter.restart()
 
         self.spritelist.clear()
         self.wave_count += 1
@@ -122,7 +276,7 @@ class WavePlayer:
 
     def update(self, delta_time: Seconds) -> None:
         if self.playing:
-            if (GLOBAL_CLOCK.time > self.current_wave_start_time + self.current_wave.total_time or
+            if (self.clock.time > self.current_wave_start_time + self.current_wave.total_time or
                 self.current_wave.skip_condition(self.current_wave, self.character, self.score_tracker)):
                 self.next_wave()
 
@@ -130,11 +284,17 @@ class WavePlayer:
             self.score_tracker.update(delta_time)
             self.spritelist.update(delta_time)
 
-            for mp in self.current_wave.motion_paths:
-                mp.update_position(GLOBAL_CLOCK.time - self.current_wave_start_time)
-                mp.enemy.emitter.update(delta_time)
-                if hasattr(mp.enemy, "sprite_list"):
-                    mp.enemy.sprite_list.update_animation(delta_time) # type: ignore -- I literally just hasattred this
+            with self._timer("enemies"):
+                positions = self.current_wave.path_batch.positions_at(self.clock.time - self.current_wave_start_time)
+                for mp, (x, y) in zip(self.current_wave.motion_paths, positions.tolist(), strict = True):
+                    mp.enemy.position = Vec2(x, y)
+            with self._timer("lux"):
+                lux_batch.update()
+            with self._timer("patterns"):
+                for mp in self.current_wave.motion_paths:
+                    mp.enemy.emitter.update(delta_time)
+                    if hasattr(mp.enemy, "sprite_list"):
+                        mp.enemy.sprite_list.update_animation(delta_time) # type: ignore -- I literally just hasattred this
 
     def draw(self) -> None:
         self.spritelist.draw()
@@ -143,3 +303,4 @@ class WavePlayer:
         for mp in self.current_wave.motion_paths:
             mp.enemy.emitter.sprite_list.draw()
             mp.enemy.draw()
+        lux_batch.flush()
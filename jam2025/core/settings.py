@@ -64,6 +64,18 @@ class _Settings:
         self.music_volume: float
         self.ui_volume: float
 
+        # Performance
+        self.bullet_pool_size: int
+        self.gpu_bullets: bool
+        self.void_quality: str
+        self.bloom_scale: float
+        self.bloom_mips: int
+        self.bloom_storage: str
+
+        # Replays
+        self.record_replays: bool
+        self.replay_folder: str
+
         # Debug
         self.debug: bool
 
@@ -160,6 +172,18 @@ _MAPPING: dict[str, dict[str, SettingMapping]] = {
         "downsample": ("capture_downsample", 4),
         "count": ("capture_count", 30),
     },
+    "performance": {
+        "bullet_pool_size": ("bullet_pool_size", 1024),
+        "gpu_bullets": ("gpu_bullets", False),
+        "void_quality": ("void_quality", "auto"),
+        "bloom_scale": ("bloom_scale", 0.5),
+        "bloom_mips": ("bloom_mips", 2),
+        "bloom_storage": ("bloom_storage", "rgb11f"),
+    },
+    "replay": {
+        "record": ("record_replays", False),
+        "folder": ("replay_folder", "replays"),
+    },
     "debug": {"debug": ("debug", False)}
 }
 
@@ -0,0 +1,60 @@
+from arcade import Sound
+from arcade.clock import GLOBAL_CLOCK
+from pyglet.media import Player
+
+from jam2025.core.settings import settings
+from jam2025.data.loading import load_sound
+
+__all__ = (
+    "sounds",
+)
+
+class _SoundManager:
+    """Loads each sound effect once and keeps bursts of the same effect from flooding the mixer.
+
+    * Triggering the same sound more than once in a tick only plays it once.
+    * At most `max_voices` copies of a sound play at the same time; extra triggers are dropped.
+    * Playback volume is scaled by the `sfx_volume` and `master_volume` settings.
+    * Nothing plays while `enabled` is False (headless runs)."""
+
+    def __init__(self, max_voices: int = 4) -> None:
+        self.max_voices = max_voices
+        self.enabled = True
+
+        self._sounds: dict[str, Sound] = {}
+        self._voices: dict[str, list[Player]] = {}
+        self._last_tick: dict[str, int] = {}
+
+    def get(self, name: str) -> Sound:
+        if name not in self._sounds:
+            self._sounds[name] = load_sound(name)
+        return self._sounds[name]
+
+    def play(self, name: str, volume: float = 1.0) -> Player | None:
+        if not self.enabled:
+            return None
+        tick = GLOBAL_CLOCK.ticks
+        if self._last_tick.get(name) == tick:
+            return None
+        self._last_tick[name] = tick
+
+        sound = self.get(name)
+        voices = [p for p in self._voices.get(name, []) if sound.is_playing(p)]
+        if len(voices) >= self.max_voices:
+            self._voices[name] = voices
+            return None
+
+        player = sound.play(volume = volume * settings.sfx_volume * settings.master_volume)
+        voices.append(player)
+        self._voices[name] = voices
+        return player
+
+    def stop_all(self) -> None:
+        for name, voices in self._voices.items():
+            sound = self._sounds[name]
+            for player in voices:
+                if sound.is_playing(player):
+                    sound.stop(player)
+        self._voices.clear()
+
+sounds = _SoundManager()
@@ -0,0 +1,61 @@
+from arcade import Text, Vec2
+import arcade
+
+from jam2025.lib.frame_profiler import HISTORY, FrameProfiler
+
+GRAPH_HEIGHT = 80
+GRAPH_TOP = 0.05
+"""Frame time (in seconds) at the top of the graph; longer frames are clipped to it."""
+REFERENCE_FRAME_TIMES = ((1 / 60, (0, 255, 0, 128)), (1 / 30, (255, 160, 0, 128)))
+
+class ProfilerOverlay:
+    """A FrameProfiler's frame time graph and per stage CPU/GPU timings, anchored at a top left corner.
+
+    The text is only rebuilt every REFRESH seconds; laying it out every frame would show up in the numbers."""
+    REFRESH = 0.25
+
+    def __init__(self, profiler: FrameProfiler, top_left: Vec2) -> None:
+        self.profiler = profiler
+        self.top_left = top_left
+        self.width = HISTORY * 2
+        self.text = Text("", top_left.x + 5, top_left.y - GRAPH_HEIGHT - 10, font_size = 11, font_name = "GohuFont 11 Nerd Font Mono", anchor_y = "top",
+                         multiline = True, width = self.width)
+        self._since_refresh = self.REFRESH
+
+    def update(self, delta_time: float) -> None:
+        self._since_refresh += delta_time
+        if self._since_refresh < self.REFRESH:
+            return
+        self._since_refresh = 0.0
+        self.text.text = self.report()
+
+    def report(self) -> str:
+        profiler = self.profiler
+        mean, p95, p99 = profiler.frame_times.stats()
+        lines = [
+            f"frame {mean * 1e3:6.2f}ms  p95 {p95 * 1e3:6.2f}  p99 {p99 * 1e3:6.2f}  ({1 / mean if mean else 0:.0f} fps)",
+            "",
+            f"{'stage':<12} {'cpu':>6} {'p95':>6} {'p99':>6}   {'gpu':>6} {'p95':>6} {'p99':>6}"
+        ]
+        for name in profiler.stages:
+            cpu = "".join(f" {v * 1e3:6.2f}" for v in profiler.cpu[name].stats()) if name in profiler.cpu else " " * 21
+            gpu = "".join(f" {v * 1e3:6.2f}" for v in profiler.gpu_times[name].stats()) if name in profiler.gpu_times else ""
+            lines.append(f"{name:<12}{cpu}  {gpu}")
+        if not profiler.gpu_timing:
+            lines.append("(no GPU timer queries on this context)")
+        return "\n".join(lines)
+
+    def draw(self) -> None:
+        left, top = self.top_left
+        bottom = top - GRAPH_HEIGHT
+        arcade.draw_rect_filled(arcade.LRBT(left, left + self.width, self.text.bottom - 5, top), (0, 0, 0, 192))
+        for frame_time, color in REFERENCE_FRAME_TIMES:
+            y = bottom + min(frame_time / GRAPH_TOP, 1.0) * GRAPH_HEIGHT
+            arcade.draw_line(left, y, left + self.width, y, color)
+
+        values = self.profiler.frame_times.values()
+        if len(values) > 1:
+            heights = (values / GRAPH_TOP).clip(0, 1) * GRAPH_HEIGHT
+            points = [(left + self.width - (len(values) - 1 - i) * 2, bottom + h) for i, h in enumerate(heights.tolist())]
+            arcade.draw_line_strip(points, arcade.color.WHITE)
+        self.text.draw()
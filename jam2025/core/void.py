@@ -1,7 +1,188 @@
+from array import array
+from dataclasses import dataclass
+import hashlib
+from string import Template
+
 import arcade
+import arcade.gl as gl
 from arcade.clock import GLOBAL_CLOCK
-from arcade.experimental.shadertoy import Shadertoy
-from arcade.types import RGBA255
+from arcade.types import Color, RGBA255
+import numpy as np
+
+from jam2025.core.settings import settings
+from jam2025.data.loading import load_shader
+from jam2025.lib.logging import logger
+from jam2025.lib.shader_cache import ShaderSource, get_shader_cache, register
+from jam2025.lib.utils import user_cache_dir
+
+def shadertoy_source(main: str) -> ShaderSource:
+    """The whole program arcade's Shadertoy builds around a `mainImage` function."""
+    with open(arcade.resources.resolve(":system:shaders/shadertoy/base_vs.glsl")) as fp:
+        vertex = fp.read()
+    with open(arcade.resources.resolve(":system:shaders/shadertoy/base_fs.glsl")) as fp:
+        fragment = Template(fp.read()).substitute({"mainfunc": main})
+    return ShaderSource(vertex, fragment)
+
+class ShadertoyRenderer:
+    """Draws a `shadertoy_source` program from the ShaderCache, like arcade's Shadertoy without compiling its own.
+
+    Only sets iTime, iResolution and iFrame; nothing here reads the mouse or any channels."""
+
+    def __init__(self, size: tuple[int, int], source: ShaderSource) -> None:
+        self.size = size
+        self.frame = 0
+        self.ctx = arcade.get_window().ctx
+        self._quad = get_shader_cache(self.ctx).quad_2d_fs()
+        self.reload(source)
+
+    def reload(self, source: ShaderSource) -> None:
+        """Switch to another `shadertoy_source` program."""
+        self.source = source
+        self.program = get_shader_cache(self.ctx).program(source)
+
+    def render(self, time: float, geometry: gl.Geometry | None = None) -> None:
+        """Render at `time`, through `geometry` (clip space quads, with uvs) or the full screen quad."""
+        self.program.set_uniform_safe("iTime", time)
+        self.program.set_uniform_safe("iResolution", (*self.size, 1.0))
+        self.program.set_uniform_safe("iFrame", self.frame)
+        (geometry or self._quad).render(self.program)
+        self.frame += 1
+
+@dataclass(frozen=True)
+class VoidQuality:
+    scale: float
+    """Fraction of the window's resolution the void is marched at (it's filtered back up)."""
+    interleave: int
+    """1, 2 or 4: how many frames it takes to refresh every pixel, a share of them each frame."""
+    baked: bool = False
+    """Play a loop rendered once (and cached on disk) instead of marching anything at runtime."""
+
+VOID_QUALITIES: dict[str, VoidQuality] = {
+    "full": VoidQuality(1.0, 1),
+    "high": VoidQuality(0.5, 1),
+    "medium": VoidQuality(0.5, 2),
+    "low": VoidQuality(0.25, 4),
+    "baked": VoidQuality(0.25, 1, baked = True)
+}
+
+def void_quality(name: str | None = None) -> VoidQuality:
+    """A named quality (settings.void_quality by default); "auto" is high in a window and low fullscreen."""
+    name = name or settings.void_quality
+    if name not in VOID_QUALITIES and name != "auto":
+        logger.warning(f"unknown void quality {name!r}, using auto")
+        name = "auto"
+    if name == "auto":
+        name = "low" if arcade.get_window().fullscreen else "high"
+    return VOID_QUALITIES[name]
+
+# Scales the marched image up to the whole screen, with the overlay mixed in on the way.
+VOID_BLIT = register(ShaderSource(load_shader('basic_vs'), """#version 330
+uniform sampler2D source;
+uniform vec4 overlay;
+
+in vec2 vs_uv;
+
+out vec4 fs_colour;
+
+void main(){
+    fs_colour = vec4(mix(texture(source, vs_uv).rgb, overlay.rgb, overlay.a), 1.0);
+}
+"""))
+
+# Plays the baked loop, blending between its two nearest frames, with the overlay mixed in.
+VOID_LOOP_BLIT = register(ShaderSource(load_shader('basic_vs'), """#version 330
+uniform sampler2DArray frames;
+uniform float frame;
+uniform int count;
+uniform vec4 overlay;
+
+in vec2 vs_uv;
+
+out vec4 fs_colour;
+
+void main(){
+    int a = int(frame);
+    vec3 colour = mix(texture(frames, vec3(vs_uv, a)).rgb, texture(frames, vec3(vs_uv, (a + 1) % count)).rgb, fract(frame));
+    fs_colour = vec4(mix(colour, overlay.rgb, overlay.a), 1.0);
+}
+"""))
+
+# 15 frames a second: the void changes fast, and blending frames further apart than that smears it.
+# At 1080p the baked loop (a quarter of the resolution) is about 47MB of texture.
+LOOP_SECONDS = 8.0
+LOOP_FRAMES = 120
+LOOP_FADE = 0.25
+"""Share of the loop spent crossfading its end back into its start."""
+LOOP_CACHE_PATH = user_cache_dir('void')
+
+def bake_void_loop(size: tuple[int, int]) -> np.ndarray:
+    """(LOOP_FRAMES, height, width, 3) bytes: the void at `size`, made into a seamless LOOP_SECONDS loop.
+
+    The shader never repeats, so the end of the loop fades into the shader one loop earlier, which
+    is where the start of the loop came from."""
+    ctx = arcade.get_window().ctx
+    fbo = ctx.framebuffer(color_attachments=[ctx.texture(size, components=3)])
+    shadertoy = ShadertoyRenderer(size, Void.PROGRAM)
+
+    def render(time: float) -> np.ndarray:
+        with fbo.activate():
+            shadertoy.render(time)
+        return np.frombuffer(fbo.read(components=3), np.uint8).reshape(size[1], size[0], 3).astype(np.float32)
+
+    frames = np.empty((LOOP_FRAMES, size[1], size[0], 3), np.uint8)
+    for i in range(LOOP_FRAMES):
+        t = i / LOOP_FRAMES * LOOP_SECONDS
+        fade = min(max((i / LOOP_FRAMES - (1 - LOOP_FADE)) / LOOP_FADE, 0.0), 1.0)
+        frame = render(t)
+        if fade:
+            frame = frame * (1 - fade) + render(t - LOOP_SECONDS) * fade
+        frames[i] = np.rint(frame)
+    return frames
+
+def load_void_loop(size: tuple[int, int]) -> np.ndarray:
+    """`bake_void_loop`, going through the on-disk cache (one entry per size)."""
+    parts = (Void.PROGRAM.key, size, LOOP_SECONDS, LOOP_FRAMES, LOOP_FADE)
+    path = LOOP_CACHE_PATH / f"{hashlib.sha256(repr(parts).encode()).hexdigest()}.npz"
+    if path.exists():
+        try:
+            with np.load(path) as data:
+                frames = data["frames"]
+            if frames.shape == (LOOP_FRAMES, size[1], size[0], 3):
+                return frames
+        except (OSError, ValueError, KeyError):
+            pass  # Corrupt or unreadable; just bake it again.
+
+    logger.info(f"Baking a {size[0]}x{size[1]} void loop")
+    frames = bake_void_loop(size)
+    try:
+        path.parent.mkdir(parents = True, exist_ok = True)
+        np.savez_compressed(path, frames = frames)
+    except OSError:
+        pass  # The cache is only a speedup.
+    return frames
+
+# Interleaving is done in 8x8 tiles rather than pixels: GPUs shade blocks of neighbouring pixels
+# together, so skipping single pixels saves nothing. The skipped tiles aren't drawn at all, since a
+# `discard` anywhere in the march makes some drivers compile all of it worse.
+VOID_TILE = 8
+# Which frame of four refreshes each tile of a 2x2 block; any two in a row make a checkerboard.
+TILE_ORDER = (0, 1, 3, 2)
+
+def _tile_geometry(ctx: arcade.ArcadeContext, size: tuple[int, int], interleave: int, phase: int) -> gl.Geometry:
+    """Clip space quads over the tiles of a `size` target that get refreshed on `phase`."""
+    w, h = size
+    vertices = []
+    for ty in range(0, h, VOID_TILE):
+        for tx in range(0, w, VOID_TILE):
+            cell = (tx // VOID_TILE & 1) + 2 * (ty // VOID_TILE & 1)
+            if TILE_ORDER[cell] % interleave != phase:
+                continue
+            l, r = tx / w, min(tx + VOID_TILE, w) / w
+            b, t = ty / h, min(ty + VOID_TILE, h) / h
+            for u, v in ((l, b), (r, b), (r, t), (l, b), (r, t), (l, t)):
+                vertices.extend((u * 2 - 1, v * 2 - 1, u, v))
+    buffer = ctx.buffer(data=array("f", vertices))
+    return ctx.geometry([gl.BufferDescription(buffer, "2f 2f", ["in_vert", "in_uv"])], mode=ctx.TRIANGLES)
 
 class Void:
     SHADER = """void mainImage(out vec4 fragColor, in vec2 fragCoord) {
@@ -33,12 +214,56 @@ class Void:
 }
 """
 
-    def __init__(self, region: arcade.Rect) -> None:
-        """https://www.shadertoy.com/view/3XG3WK"""
+    PROGRAM = register(shadertoy_source(SHADER))
+
+    def __init__(self, region: arcade.Rect, quality: VoidQuality | None = None) -> None:
+        """https://www.shadertoy.com/view/3XG3WK
+
+        Marched into a texture at `quality` (settings.void_quality by default) and drawn scaled up, or
+        played from a loop baked once per size at the "baked" quality."""
         self.region = region
-        self.shadertoy = Shadertoy((int(region.width), int(region.height)), Void.SHADER)
+        self.quality = quality or void_quality()
         self.overlay_color: RGBA255 = (0, 0, 0, 255 - 32)
 
+        ctx = arcade.get_window().ctx
+        size = (max(1, round(region.width * self.quality.scale)), max(1, round(region.height * self.quality.scale)))
+        shaders = get_shader_cache(ctx)
+        self._quad = shaders.quad_2d_fs()
+        self.loop: gl.TextureArray | None = None
+        if self.quality.baked:
+            frames = load_void_loop(size)
+            self.loop = ctx.texture_array((*size, LOOP_FRAMES), components=3, data=frames.tobytes(),
+                                          wrap_x=gl.CLAMP_TO_EDGE, wrap_y=gl.CLAMP_TO_EDGE, filter=(gl.LINEAR, gl.LINEAR))
+            self._blit = shaders.program(VOID_LOOP_BLIT)
+            return
+
+        self.texture = ctx.texture(size, components=3, wrap_x=gl.CLAMP_TO_EDGE, wrap_y=gl.CLAMP_TO_EDGE, filter=(gl.LINEAR, gl.LINEAR))
+        self.fbo = ctx.framebuffer(color_attachments=[self.texture])
+        self.shadertoy = ShadertoyRenderer(size, Void.PROGRAM)
+        self._blit = shaders.program(VOID_BLIT)
+        self._phases = [_tile_geometry(ctx, size, self.quality.interleave, phase) for phase in range(self.quality.interleave)]
+        self._frame = 0
+
     def draw(self) -> None:
-        self.shadertoy.render(time = GLOBAL_CLOCK.time)
-        arcade.draw_rect_filled(arcade.get_window().rect, self.overlay_color)
+        time = GLOBAL_CLOCK.time
+        self._blit["overlay"] = Color(*self.overlay_color).normalized
+        if self.loop is not None:
+            self._blit["frames"] = 0
+            self._blit["frame"] = time / LOOP_SECONDS % 1 * LOOP_FRAMES
+            self._blit["count"] = LOOP_FRAMES
+            self.loop.use(0)
+            self._quad.render(self._blit)
+            return
+
+        with self.fbo.activate():
+            if self.quality.interleave == 1:
+                self.shadertoy.render(time)
+            else:
+                # Every pixel on the first frame, so nothing starts out black.
+                for geometry in self._phases if not self._frame else (self._phases[self._frame % len(self._phases)],):
+                    self.shadertoy.render(time, geometry)
+        self._frame += 1
+
+        self._blit["source"] = 0
+        self.texture.use(0)
+        self._quad.render(self._blit)
@@ -11,6 +11,7 @@ from .settings import settings
 from jam2025.lib.webcam import Webcam
 from jam2025.lib.logging import logger
 from jam2025.lib.procedural_animator import SecondOrderAnimatorKClamped
+from jam2025.lib.stage_timer import NULL_TIMER
 from jam2025.lib.utils import frame_data_to_image, rgb_to_l
 
 class SimpleAnimatedWebcamDisplay:
@@ -127,6 +128,7 @@ class WebcamController:
         self._response = settings.motion_response
 
         self.timeout = 1.0
+        self.timer = NULL_TIMER
 
         self.flip = False
         self.show_lightness = False
@@ -281,7 +283,7 @@ class WebcamController:
 
         if positions.size > 0:
             average_position = np.mean(positions, axis=0)
-            self._cloud = tuple(zip(positions, brightest))
+            self._cloud = tuple(zip(positions, brightest, strict = True))
         else:
             average_position = (0.0, 0.0)
             self._cloud = ()
@@ -309,6 +311,12 @@ class WebcamController:
         self.response = settings.motion_response
 
     def update(self, delta_time: float) -> None:
+        with self.timer("webcam"):
+            self._update_frame()
+        with self.timer("tracking"):
+            self._update_cursor(delta_time)
+
+    def _update_frame(self) -> None:
         frame_data = self._get_frame_data()
         frame = frame_data_to_image(frame_data) if frame_data is not None else None
         crunchy_frame = frame_data_to_image(frame_data[::self._downsample, ::self._downsample]) if frame_data is not None else None
@@ -325,6 +333,8 @@ class WebcamController:
                 crunchy_frame = crunchy_frame.convert("L").convert("RGBA")
             crunchy_tex = arcade.Texture(crunchy_frame)
             self.crunchy_sprite.texture = crunchy_tex
+
+    def _update_cursor(self, delta_time: float) -> None:
         self._raw_cursor = self.get_brightest_pixel(self._threshold, self._downsample)
         if self._cursor is None and self._raw_cursor:
             self._refresh_animator()
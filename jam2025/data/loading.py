@@ -1,6 +1,8 @@
 # This is done the "bad" way.
 
 import importlib.resources as pkg_resources
+import arcade
+import arcade.gl as gl
 from arcade import Sprite, Texture, Sound, load_texture as _load_texture, load_sound as _load_sound, load_font as _load_font
 from jam2025 import data
 from jam2025.lib.gif import GIF
@@ -14,6 +16,11 @@ def load_sprite(name: str, ext: str = "png") -> Sprite:
         tex = _load_texture(p / "images" / f"{name}.{ext}")
     return Sprite(tex)
 
+def load_gl_texture(name: str, ext: str = "png") -> gl.Texture2D:
+    """Load an image straight into a GL texture (for custom shaders), skipping the texture atlas."""
+    with pkg_resources.path(data) as p:
+        return arcade.get_window().ctx.load_texture(p / "images" / f"{name}.{ext}")
+
 def load_spritesheet(name: str, rows: int, cols: int, frames: int, fps: float, ext: str = "png") -> GIF:
     with pkg_resources.path(data) as p:
         return GIF(p / "images" / f"{name}.{ext}", rows, cols, frames, fps)
@@ -33,3 +40,8 @@ def load_font(name: str, ext: str = "ttf") -> None:
 def load_shader(name: str, ext: str = "glsl") -> str:
     with pkg_resources.path(data) as p:
         return (p / "shaders" / f"{name}.{ext}").read_text()
+
+def load_content() -> dict[str, bytes]:
+    """The raw bytes of every pattern/wave file in data/content, by file name."""
+    with pkg_resources.path(data) as p:
+        return {f.name: f.read_bytes() for f in sorted((p / "content").glob("*.toml"))}
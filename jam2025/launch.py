@@ -3,6 +3,7 @@ from jam2025.core.settings import settings, write_settings
 from jam2025.core.navigation import navigation
 from jam2025.core.application import Window
 from jam2025.lib import logging
+from jam2025.lib.shader_cache import get_shader_cache
 from jam2025.lib.webcam import Webcam
 
 from .views import MouseCalibrationView, SelectWebcamView, ViewSelectView, GameView
@@ -12,6 +13,8 @@ def launch() -> None:
         logging.setup()
 
         win = Window()
+        # Compile every shader now, rather than on the first frame or wave that needs it.
+        get_shader_cache(win.ctx).warm()
         load_constants()
 
         # I have to import these here...
@@ -1,21 +1,39 @@
 """
 Post Processing FrameBuffer
+
+A Frame captures what's drawn inside it and runs it through its processes, a small render graph:
+each Process declares the target it draws into and any scratch targets it needs while it runs, and
+the Frame hands those out from the context's RenderTargetPool just for as long as they're needed.
+Targets go back to the pool as soon as the next pass has read them, so stacked processes reuse the
+same few textures (and their framebuffers) instead of each allocating their own, and frame after
+frame nothing new gets made. Disabled processes are skipped entirely.
+
+Anything that changes the framebuffer, viewport, camera or blending saves and restores it through
+GLState, rather than keeping its own copies.
 """
 from array import array
+from collections.abc import Generator
 from dataclasses import dataclass
 from contextlib import contextmanager
-from typing import Any
+from typing import Any, NamedTuple
+from weakref import WeakKeyDictionary
 
 import arcade
 import arcade.gl as gl
 import pyglet.gl as pygl
 
 from jam2025.data.loading import load_shader
+from jam2025.lib.shader_cache import ShaderSource, get_shader_cache, register
+
+BLOOM_DOWNSAMPLE = register(ShaderSource(load_shader('basic_vs'), load_shader('Bloom_p_downsample_fs')))
+BLOOM_UPSAMPLE = register(ShaderSource(load_shader('basic_vs'), load_shader('Bloom_p_upsample_fs')))
+BLOOM_RENDER = register(ShaderSource(load_shader('basic_vs'), load_shader('Bloom_p_fs')))
+FRAME_RENDER = register(ShaderSource(load_shader('frame_render_vs'), load_shader('frame_render_fs')))
 
 @dataclass
 class TextureConfig:
     components = 4
-    dtype = 'f4'
+    dtype = 'f2'
     wrap_x = gl.CLAMP_TO_EDGE
     wrap_y = gl.CLAMP_TO_EDGE
     filter_x = gl.NEAREST
@@ -30,85 +48,183 @@ class FrameConfig:
     source_texture: TextureConfig
 
 
+@dataclass
+class GLState:
+    """The bits of GL state post processing changes, to put back afterwards."""
+    framebuffer: gl.Framebuffer
+    viewport: tuple[int, int, int, int]
+    camera: Any
+    blend_func: tuple[int, ...]
+    blend: bool
+
+    @classmethod
+    def save(cls, ctx: arcade.ArcadeContext) -> "GLState":
+        return cls(ctx.active_framebuffer, ctx.viewport, ctx.current_camera, ctx.blend_func, ctx.is_enabled(ctx.BLEND))
+
+    def restore(self, ctx: arcade.ArcadeContext) -> None:
+        self.framebuffer.use()
+        self.camera.use()
+        ctx.viewport = self.viewport
+        ctx.blend_func = self.blend_func
+        if self.blend:
+            ctx.enable(ctx.BLEND)
+        else:
+            ctx.disable(ctx.BLEND)
+
+@contextmanager
+def saved_gl_state(ctx: arcade.ArcadeContext) -> Generator[GLState]:
+    state = GLState.save(ctx)
+    try:
+        yield state
+    finally:
+        state.restore(ctx)
+
+
+@dataclass(frozen=True)
+class TargetSpec:
+    """What a pass needs to draw into, with its size relative to the frame's input size."""
+    scale: float = 1.0
+    level: int = 0
+    """Halvings of the scaled size, for mip chains."""
+    components: int = 4
+    dtype: str = 'f2'
+    internal_format: int | None = None
+    filter: int = gl.NEAREST
+
+    def size(self, base: tuple[int, int]) -> tuple[int, int]:
+        return max(1, int(base[0] * self.scale) >> self.level), max(1, int(base[1] * self.scale) >> self.level)
+
+class RenderTarget(NamedTuple):
+    texture: gl.Texture2D
+    fbo: gl.Framebuffer
+
+class RenderTargetPool:
+    """Textures (each with a framebuffer) handed out to passes and taken back for the next ones to reuse."""
+
+    def __init__(self, ctx: arcade.ArcadeContext) -> None:
+        self.ctx = ctx
+        self._free: dict[tuple, list[RenderTarget]] = {}
+        self._keys: dict[int, tuple] = {}
+
+    def _key(self, size: tuple[int, int], spec: TargetSpec) -> tuple:
+        return (size, spec.components, spec.dtype, spec.internal_format, spec.filter)
+
+    @property
+    def allocated(self) -> int:
+        """How many targets the pool has made, in use or not."""
+        return len(self._keys)
+
+    def acquire(self, size: tuple[int, int], spec: TargetSpec) -> RenderTarget:
+        """A target matching `spec` at `size`; what's in it is left over from whoever had it last."""
+        key = self._key(size, spec)
+        free = self._free.get(key)
+        if free:
+            return free.pop()
+        texture = self.ctx.texture(size, components=spec.components, dtype=spec.dtype, internal_format=spec.internal_format,
+                                   wrap_x=gl.CLAMP_TO_EDGE, wrap_y=gl.CLAMP_TO_EDGE, filter=(spec.filter, spec.filter))
+        target = RenderTarget(texture, self.ctx.framebuffer(color_attachments=[texture]))
+        self._keys[id(texture)] = key
+        return target
+
+    def release(self, target: RenderTarget) -> None:
+        self._free.setdefault(self._keys[id(target.texture)], []).append(target)
+
+    def trim(self) -> None:
+        """Let go of every target not in use (after a resize, say)."""
+        for targets in self._free.values():
+            for target in targets:
+                del self._keys[id(target.texture)]
+        self._free.clear()
+
+_pools: WeakKeyDictionary[gl.Context, RenderTargetPool] = WeakKeyDictionary()
+
+def get_render_target_pool(ctx: arcade.ArcadeContext | None = None) -> RenderTargetPool:
+    """The RenderTargetPool of `ctx` (the window's, by default), shared by every Frame on it."""
+    ctx = ctx or arcade.get_window().ctx
+    if ctx not in _pools:
+        _pools[ctx] = RenderTargetPool(ctx)
+    return _pools[ctx]
+
+
 class Process:
+    output = TargetSpec()
+    """The target the process draws into (bound when it's called)."""
+    scratch: tuple[TargetSpec, ...] = ()
+    """Targets it needs only while it runs, passed to it in this order."""
+    covers_output = False
+    """Whether it draws every pixel of its output; if not, the output is cleared first."""
 
     def __init__(self, ctx: arcade.ArcadeContext = None) -> None:
         self.ctx = ctx or arcade.get_window().ctx
-        self.geo = gl.geometry.quad_2d_fs()
+        self.shaders = get_shader_cache(self.ctx)
+        self.geo = self.shaders.quad_2d_fs()
+        self.enabled = True
 
-    def __call__(self, base: gl.Texture2D, source: gl.Texture2D) -> Any:
+    def __call__(self, base: gl.Texture2D, source: gl.Texture2D, scratch: list[RenderTarget]) -> Any:
         pass
 
+# name: (dtype, internal format). R11F_G11F_B10F is half the size of f2 and plenty for a blur.
+BLOOM_STORAGE: dict[str, tuple[str, int | None]] = {
+    "rgb11f": ("f2", pygl.GL_R11F_G11F_B10F),
+    "f2": ("f2", None)
+}
+
+def bloom_storage(ctx: arcade.ArcadeContext, name: str) -> str:
+    """`name`, or f2 if this context can't render to it."""
+    if name not in BLOOM_STORAGE:
+        return "f2"
+    if name == "rgb11f" and ctx.gl_api == "opengles" and "GL_EXT_color_buffer_float" not in ctx.extensions:
+        return "f2"
+    return name
+
 class Bloom(Process):
-    def __init__(self, size: tuple[int, int], count: int, ctx: arcade.ArcadeContext = None) -> None:
+    covers_output = True
+
+    def __init__(self, count: int, ctx: arcade.ArcadeContext = None, scale: float = 0.5, storage: str = "rgb11f") -> None:
+        """`count` mip levels, the first at `scale` (0.5 or 0.25) of the frame, stored as `storage` (see BLOOM_STORAGE)."""
         super().__init__(ctx)
-        self.textures = [
-            self.ctx.texture((size[0]>>level, size[1]>>level), components=3, dtype="f2", wrap_x=gl.CLAMP_TO_EDGE, wrap_y=gl.CLAMP_TO_EDGE, filter=(gl.LINEAR, gl.LINEAR)) for level in range(count)
-        ]
-        self.fbo = self.ctx.framebuffer(color_attachments=self.textures[0])
-
-        self.downsample_program = self.ctx.program(
-            vertex_shader=load_shader('basic_vs'),
-            fragment_shader=load_shader('Bloom_p_downsample_fs')
-        )
-        self.upsample_program = self.ctx.program(
-            vertex_shader=load_shader('basic_vs'),
-            fragment_shader=load_shader('Bloom_p_upsample_fs')
-        )
-        self.render_program = self.ctx.program(
-            vertex_shader=load_shader('basic_vs'),
-            fragment_shader=load_shader('Bloom_p_fs')
-        )
-        self.render_program['strength'] = 0.1
-        self.render_program['base'] = 0
-        self.render_program['source'] = 1
-        self.render_program['blur'] = 2
+        dtype, internal_format = BLOOM_STORAGE[bloom_storage(self.ctx, storage)]
+        self.scratch = tuple(TargetSpec(scale, level, 3, dtype, internal_format, gl.LINEAR) for level in range(count))
 
-    def downsample(self, source: gl.Texture2D):
-        viewport = self.ctx.viewport
-        self.downsample_program.use()
-        self.downsample_program["resolution"] = 1.0 / self.textures[0].width, 1.0 / self.textures[0].height
+        self.downsample_program = self.shaders.program(BLOOM_DOWNSAMPLE)
+        self.upsample_program = self.shaders.program(BLOOM_UPSAMPLE)
+        self.render_program = self.shaders.program(BLOOM_RENDER)
+        self.strength = 0.1
 
-        source.use(0)
-        for level in self.textures:
-            self.ctx.viewport = (0, 0, level.width, level.height)
-            pygl.glFramebufferTexture2D(pygl.GL_FRAMEBUFFER, pygl.GL_COLOR_ATTACHMENT0, pygl.GL_TEXTURE_2D, level.glo, 0)
-            self.geo.render(self.downsample_program)
-            self.downsample_program['resolution'] = 1.0 / level.width, 1.0 / level.height
-            level.use()
+    def downsample(self, source: gl.Texture2D, levels: list[RenderTarget]):
+        # Each pass samples around the texels of the one before, starting with the (bigger) source.
+        self.downsample_program["resolution"] = 1.0 / source.width, 1.0 / source.height
 
-        self.ctx.viewport = viewport
+        source.use(0)
+        for level in levels:
+            with level.fbo.activate():
+                self.geo.render(self.downsample_program)
+            self.downsample_program['resolution'] = 1.0 / level.texture.width, 1.0 / level.texture.height
+            level.texture.use()
 
-    def upsample(self, radius: float):
-        blend = self.ctx.blend_func
+    def upsample(self, radius: float, levels: list[RenderTarget]):
         self.ctx.blend_func = self.ctx.BLEND_ADDITIVE
         self.ctx.enable(self.ctx.BLEND)
         self.upsample_program['radius'] = radius
 
-        for idx in range(len(self.textures)-1, 0, -1):
-            level = self.textures[idx]
-            next_level = self.textures[idx - 1]
-
-            level.use()
-
-            self.ctx.viewport = (0, 0, next_level.width, next_level.height)
-            pygl.glFramebufferTexture2D(pygl.GL_FRAMEBUFFER, pygl.GL_COLOR_ATTACHMENT0, pygl.GL_TEXTURE_2D, next_level.glo, 0)
-            self.geo.render(self.upsample_program)
+        for idx in range(len(levels)-1, 0, -1):
+            levels[idx].texture.use()
+            with levels[idx - 1].fbo.activate():
+                self.geo.render(self.upsample_program)
 
-        self.ctx.disable(self.ctx.BLEND)
-        self.ctx.blend_func = blend
+    def __call__(self, base: gl.Texture2D, source: gl.Texture2D, scratch: list[RenderTarget]) -> Any:
+        with saved_gl_state(self.ctx):
+            self.downsample(source, scratch)
+            self.upsample(0.005, scratch)
 
-    def __call__(self, base: gl.Texture2D, source: gl.Texture2D) -> Any:
-        viewport = self.ctx.viewport
-
-        with self.fbo.activate():
-            self.downsample(source)
-            self.upsample(0.005)
-
-        self.ctx.viewport = viewport
+        # The programs are shared, so nothing set on them can be assumed to still be there.
+        self.render_program['strength'] = self.strength
+        self.render_program['base'] = 0
+        self.render_program['source'] = 1
+        self.render_program['blur'] = 2
         base.use(0)
         source.use(1)
-        self.textures[0].use(2)
+        scratch[0].texture.use(2)
         self.geo.render(self.render_program)
 
 
@@ -120,13 +236,8 @@ class Frame:
         self.config = config
 
         self.ctx = ctx
-        texture = config.source_texture
-        self.unprocessed_texture = ctx.texture(config.input_size, components=texture.components, dtype=texture.dtype, wrap_x=texture.wrap_x, wrap_y=texture.wrap_y, filter=(texture.filter_x, texture.filter_y))
-        self.process_texture_a = ctx.texture(config.input_size, components=texture.components, dtype=texture.dtype, wrap_x=texture.wrap_x, wrap_y=texture.wrap_y, filter=(texture.filter_x, texture.filter_y))
-        self.process_texture_b = ctx.texture(config.input_size, components=texture.components, dtype=texture.dtype, wrap_x=texture.wrap_x, wrap_y=texture.wrap_y, filter=(texture.filter_x, texture.filter_y))
-        self.unprocessed_fbo = ctx.framebuffer(color_attachments=self.unprocessed_texture)
-        self.process_fbo_a = ctx.framebuffer(color_attachments=self.process_texture_a)
-        self.process_fbo_b = ctx.framebuffer(color_attachments=self.process_texture_b)
+        self._make_textures()
+        self.pool = get_render_target_pool(ctx)
 
         self.processes: list[Process] = []
 
@@ -143,15 +254,25 @@ class Frame:
             mode=ctx.TRIANGLE_STRIP,
         )
         self.set_location(config.pos, config.output_size)
-        self.render_prog = render or ctx.program(
-            vertex_shader=load_shader('frame_render_vs'),
-            fragment_shader=load_shader('frame_render_fs')
-        )
-
-        # --- holding values for context management
-        self._previous_fbo = None
-        self._previous_camera = None
-        self._previous_viewport = None
+        self.render_prog = render or get_shader_cache(ctx).program(FRAME_RENDER)
+
+        # What to go back to once the captured scene is rendered.
+        self._saved: GLState | None = None
+
+    def _make_textures(self) -> None:
+        size, texture = self.config.input_size, self.config.source_texture
+        self.unprocessed_texture = self.ctx.texture(size, components=texture.components, dtype=texture.dtype, wrap_x=texture.wrap_x, wrap_y=texture.wrap_y, filter=(texture.filter_x, texture.filter_y))
+        self.scene_texture = self.ctx.texture(size, components=texture.components, dtype=texture.dtype, wrap_x=texture.wrap_x, wrap_y=texture.wrap_y, filter=(texture.filter_x, texture.filter_y))
+        self.unprocessed_fbo = self.ctx.framebuffer(color_attachments=self.unprocessed_texture)
+        self.scene_fbo = self.ctx.framebuffer(color_attachments=self.scene_texture)
+
+    def resize(self, input_size: tuple[int, int]) -> None:
+        """Capture the scene at a new size; the pool's spare targets, sized for the old one, are let go."""
+        if input_size == self.config.input_size:
+            return
+        self.config.input_size = input_size
+        self._make_textures()
+        self.pool.trim()
 
     def set_location(self, pos: tuple[int, int], size: tuple[int, int]):
         self.config.pos = pos
@@ -172,8 +293,7 @@ class Frame:
         self.processes.insert(order, process)
 
     def clear(self, colour: arcade.types.RGBOrA255 = None, depth: float = 1.0, viewport: float = None):
-        self.process_fbo_a.clear(color=colour, depth=depth, viewport=viewport)
-        self.process_fbo_b.clear(color=colour, depth=depth, viewport=viewport)
+        self.scene_fbo.clear(color=colour, depth=depth, viewport=viewport)
 
     def capture_unprocessed(self, color: tuple[int, int, int, int] | None = None):
         self.unprocessed_fbo.clear(color=color)
@@ -185,35 +305,48 @@ class Frame:
 
     def use(self):
         self.clear((0, 0, 0, 0))
-        self._previous_fbo = self.ctx.active_framebuffer
-        self._previous_camera = self.ctx.current_camera
-        self._previous_viewport = self.ctx.viewport
-        self.process_fbo_a.use()
+        self._saved = GLState.save(self.ctx)
+        self.scene_fbo.use()
         self.ctx._default_camera.use()
 
     def __exit__(self, *_):
         self.render()
         return False
 
-    def render(self):
-        self.ctx.viewport = (0, 0, self.config.input_size[0], self.config.input_size[1])
+    def _run(self) -> RenderTarget | None:
+        """Run every enabled process in order; the last one's output (still held from the pool), if any ran."""
+        size = self.config.input_size
+        source = RenderTarget(self.scene_texture, self.scene_fbo)
+        held = None
         for process in self.processes:
-            with self.process_fbo_b.activate():
-                process(self.unprocessed_texture, self.process_texture_a)
-            self.process_texture_a, self.process_texture_b = self.process_texture_b, self.process_texture_a
-            self.process_fbo_a, self.process_fbo_b = self.process_fbo_b, self.process_fbo_a
-
-        if self._previous_fbo is not None:
-            self._previous_fbo.use()
-        if self._previous_camera is not None:
-            self._previous_camera.use()
-        if self._previous_viewport is not None:
-            self.ctx.viewport = self._previous_viewport
-        self._previous_viewport = self._previous_camera = self._previous_fbo = None
-
-        func = self.ctx.blend_func
-        self.ctx.blend_func = self.ctx.BLEND_DEFAULT
-        with self.ctx.enabled(self.ctx.BLEND):
-            self.process_texture_a.use()
+            if not process.enabled:
+                continue
+            output = self.pool.acquire(process.output.size(size), process.output)
+            scratch = [self.pool.acquire(spec.size(size), spec) for spec in process.scratch]
+            with output.fbo.activate():
+                if not process.covers_output:
+                    output.fbo.clear()
+                process(self.unprocessed_texture, source.texture, scratch)
+            # Nothing reads these again this frame, so the next process can have them.
+            for target in scratch:
+                self.pool.release(target)
+            if held is not None:
+                self.pool.release(held)
+            source = held = output
+        return held
+
+    def render(self):
+        with saved_gl_state(self.ctx):
+            result = self._run()
+
+        if self._saved is not None:
+            self._saved.restore(self.ctx)
+            self._saved = None
+
+        with saved_gl_state(self.ctx):
+            self.ctx.blend_func = self.ctx.BLEND_DEFAULT
+            self.ctx.enable(self.ctx.BLEND)
+            (result.texture if result is not None else self.scene_texture).use()
             self.render_geo.render(self.render_prog)
-        self.ctx.blend_func = func
+        if result is not None:
+            self.pool.release(result)
@@ -0,0 +1,162 @@
+"""
+Per frame CPU and GPU timings, for the profiler overlay.
+
+FrameProfiler is a StageTimer, so it can be handed to anything that already takes one (the
+simulation, the bullets, the webcam) and adds up each stage over a frame; `end_frame` files those
+totals away into a rolling history. GPU passes are timed with GL timer queries, `with
+profiler.gpu("bloom"): ...`, which are read back a few frames later, once they're ready, so
+nothing ever waits on the GPU. GL only runs one elapsed time query at a time, so GPU stages can't
+nest.
+
+While disabled, every stage is the same shared nullcontext.
+"""
+from contextlib import AbstractContextManager, nullcontext
+from ctypes import byref
+from time import perf_counter
+
+import arcade
+import numpy as np
+import pyglet.gl as pygl
+
+from jam2025.lib.stage_timer import StageTimer
+
+HISTORY = 240
+"""Frames kept for the averages, percentiles and graph."""
+
+MAX_GPU_TIME = 1.0
+"""GPU readings longer than this (in seconds) are driver junk, not a real frame."""
+
+class History:
+    """The last HISTORY samples of one timing, in seconds."""
+    __slots__ = ("count", "samples")
+
+    def __init__(self) -> None:
+        self.samples = np.zeros(HISTORY)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.samples[self.count % HISTORY] = value
+        self.count += 1
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def values(self) -> np.ndarray:
+        """Oldest first."""
+        if self.count <= HISTORY:
+            return self.samples[:self.count]
+        return np.roll(self.samples, -(self.count % HISTORY))
+
+    def stats(self) -> tuple[float, float, float]:
+        """Mean, 95th and 99th percentile."""
+        values = self.samples[:min(self.count, HISTORY)]
+        if not len(values):
+            return 0.0, 0.0, 0.0
+        p95, p99 = np.percentile(values, (95, 99))
+        return float(values.mean()), float(p95), float(p99)
+
+class _GPUStage:
+    __slots__ = ("_free", "_pending", "name", "query")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.query = 0
+        self._free: list[int] = []
+        self._pending: list[int] = []
+
+    def __enter__(self) -> None:
+        if self._free:
+            self.query = self._free.pop()
+        else:
+            query = pygl.GLuint()
+            pygl.glGenQueries(1, byref(query))
+            self.query = query.value
+        pygl.glBeginQuery(pygl.GL_TIME_ELAPSED, self.query)
+
+    def __exit__(self, *args: object) -> None:
+        pygl.glEndQuery(pygl.GL_TIME_ELAPSED)
+        self._pending.append(self.query)
+
+    def collect(self) -> float | None:
+        """Seconds of GPU time from every query that has finished since the last collect, if any have."""
+        total = None
+        available = pygl.GLint()
+        elapsed = pygl.GLuint64()
+        # Queries finish in order, so stop at the first one that hasn't.
+        while self._pending:
+            query = self._pending[0]
+            pygl.glGetQueryObjectiv(query, pygl.GL_QUERY_RESULT_AVAILABLE, byref(available))
+            if not available.value:
+                break
+            pygl.glGetQueryObjectui64v(query, pygl.GL_QUERY_RESULT, byref(elapsed))
+            # Some drivers (llvmpipe) report nonsense for the very first query.
+            if elapsed.value < MAX_GPU_TIME * 1e9:
+                total = (total or 0.0) + elapsed.value * 1e-9
+            self._free.append(self._pending.pop(0))
+        return total
+
+class FrameProfiler(StageTimer):
+    """A StageTimer that keeps a rolling per frame history of each stage, and times GPU stages too.
+
+    Call `end_frame` once a frame, whether it's enabled or not."""
+
+    _null = nullcontext()
+
+    def __init__(self, ctx: arcade.ArcadeContext | None = None) -> None:
+        super().__init__()
+        ctx = ctx or arcade.get_window().ctx
+        # Timer queries aren't in GLES.
+        self.gpu_timing = ctx.gl_api == "opengl"
+        self.enabled = False
+
+        self.frame_times = History()
+        self.cpu: dict[str, History] = {}
+        self.gpu_times: dict[str, History] = {}
+        self._gpu_stages: dict[str, _GPUStage] = {}
+        self._last_frame = perf_counter()
+
+    def __call__(self, name: str) -> AbstractContextManager:
+        if not self.enabled:
+            return self._null
+        return super().__call__(name)
+
+    def gpu(self, name: str) -> AbstractContextManager:
+        """Time the GL commands issued inside this stage; don't nest these."""
+        if not self.enabled or not self.gpu_timing:
+            return self._null
+        stage = self._gpu_stages.get(name)
+        if stage is None:
+            stage = self._gpu_stages[name] = _GPUStage(name)
+            self.gpu_times[name] = History()
+        return stage
+
+    def end_frame(self) -> None:
+        now = perf_counter()
+        if self.enabled:
+            self.frame_times.add(now - self._last_frame)
+            for name, total in self.totals.items():
+                # Stages that didn't run this frame (the webcam while it's off, say) aren't a 0ms sample.
+                if not self.counts[name]:
+                    continue
+                if name not in self.cpu:
+                    self.cpu[name] = History()
+                self.cpu[name].add(total)
+            self.reset()
+            for name, stage in self._gpu_stages.items():
+                elapsed = stage.collect()
+                if elapsed is not None:
+                    self.gpu_times[name].add(elapsed)
+        self._last_frame = now
+
+    def clear(self) -> None:
+        """Forget the history (when turning it back on, so the gap isn't counted as a frame)."""
+        self.reset()
+        self.frame_times.clear()
+        for history in (*self.cpu.values(), *self.gpu_times.values()):
+            history.clear()
+        self._last_frame = perf_counter()
+
+    @property
+    def stages(self) -> list[str]:
+        """Every stage timed so far, CPU or GPU, in the order they were first seen."""
+        return list(dict.fromkeys((*self.cpu, *self.gpu_times)))
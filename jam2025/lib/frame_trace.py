@@ -0,0 +1,27 @@
+"""
+Frame time traces: the delta time of every frame over a stretch of play, so real frame pacing (hitches
+and all) can be fed back through `python -m jam2025.bench_animators --trace`.
+
+A trace file is one frame time in seconds per line (blank lines and # comments are skipped), or a
+.npy array of them.
+"""
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+def save_trace(path: Path, frame_times: Iterable[float], comment: str = "") -> None:
+    path.parent.mkdir(parents = True, exist_ok = True)
+    lines = [f"# {line}" for line in comment.splitlines()]
+    lines.extend(repr(float(dt)) for dt in frame_times)
+    path.write_text("\n".join(lines) + "\n")
+
+def load_trace(path: Path) -> np.ndarray:
+    if path.suffix == ".npy":
+        trace = np.load(path).astype(np.float64).ravel()
+    else:
+        lines = (line.split("#")[0].strip() for line in path.read_text().splitlines())
+        trace = np.asarray([float(line) for line in lines if line], np.float64)
+    if not len(trace) or np.any(trace <= 0):
+        raise ValueError(f"{path}: a trace needs at least one frame time, all positive")
+    return trace
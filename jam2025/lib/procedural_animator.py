@@ -1,16 +1,21 @@
 from __future__ import annotations
-from math import pi, tau, ceil, exp, cos, cosh
+from math import pi, tau, ceil, exp, cos, cosh, sin, sqrt
 
 from typing import Any
 
+import numpy as np
+
 
 __all__ = (
     'ProceduralAnimator',
     'SecondOrderAnimator',
     'SecondOrderAnimatorBase',
+    'SecondOrderAnimatorExact',
     'SecondOrderAnimatorKClamped',
     'SecondOrderAnimatorPoleZero',
     'SecondOrderAnimatorTCritical',
+    'k_values',
+    'second_order_step',
     'update_default_animator'
 )
 
@@ -18,6 +23,32 @@ Animatable = Any # god damn in nuitka
 K = Any
 A = Any
 
+def k_values(frequency: K, damping: K, response: K) -> tuple[K, K, K]:
+    """k1, k2 and k3 for a frequency, damping and response; floats or numpy arrays."""
+    k1 = damping / (pi * frequency)
+    k2 = 1.0 / (tau * frequency) ** 2.0
+    k3 = (response * damping) / (tau * frequency)
+    return k1, k2, k3
+
+def second_order_step(dt: K, x: np.ndarray, dx: np.ndarray, y: np.ndarray, dy: np.ndarray, k1: K, k2: K, k3: K,
+                      scratch: np.ndarray | None = None) -> None:
+    """SecondOrderAnimator's update for a whole array of animators at once, in place on `y` and `dy`.
+
+    `dt` and the k values broadcast against the points. `dx` is used up as working space, and `scratch`
+    (shaped like `y`) saves an allocation."""
+    scratch = np.empty_like(y) if scratch is None else scratch
+    np.multiply(dy, dt, out = scratch)
+    y += scratch
+    # dy += (x + dx k3 - y - dy k1) dt / k2
+    dx *= k3
+    dx += x
+    dx -= y
+    np.multiply(dy, k1, out = scratch)
+    dx -= scratch
+    dx *= dt
+    dx /= k2
+    dy += dx
+
 class SecondOrderAnimatorBase:
 
     def __init__(self, frequency: K, damping: K, response: K,  x_initial: A, y_initial: A, y_d_initial: A):
@@ -29,9 +60,10 @@ class SecondOrderAnimatorBase:
         self._damp: K = damping
         self._resp: K = response
 
-        self.k1: K = damping / (pi * frequency)
-        self.k2: K = 1.0 / (tau * frequency) ** 2.0
-        self.k3: K = (response * damping) / (tau * frequency)
+        self.k1: K
+        self.k2: K
+        self.k3: K
+        self.k1, self.k2, self.k3 = k_values(frequency, damping, response)
 
     @property
     def frequency(self) -> K:
@@ -68,9 +100,7 @@ class SecondOrderAnimatorBase:
         self.calc_k_vals()
 
     def calc_k_vals(self) -> None:
-        self.k1 = self._damp / (pi * self._freq)
-        self.k2 = 1.0 / (tau * self._freq)**2.0
-        self.k3 = (self._resp * self._damp) / (tau * self._freq)
+        self.k1, self.k2, self.k3 = k_values(self._freq, self._damp, self._resp)
 
     def update(self, dt: float, nx: A, dx: A | None = None) -> A:
         raise NotImplementedError()
@@ -188,7 +218,86 @@ class SecondOrderAnimatorPoleZero(SecondOrderAnimatorBase):
         return self.y
 
 
-ProceduralAnimator = SecondOrderAnimatorKClamped
+def _transition(k1: K, k2: K, t: float) -> tuple[K, K, K, K]:
+    """exp(M t) for the animator's unforced system M = [[0, 1], [-1/k2, -k1/k2]], as (m11, m12, m21, m22).
+
+    Works on floats or numpy arrays of k values. Written with exponentials that never grow,
+    so it stays finite however big t is."""
+    h = -k1 / (2.0 * k2)  # half the trace
+    disc = h * h - 1.0 / k2
+    if isinstance(k1, np.ndarray) or isinstance(k2, np.ndarray):
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            s = np.sqrt(np.abs(disc))
+            # Overdamped: both exponents are <= 0
+            fast, slow = np.exp((h - s) * t), np.exp((h + s) * t)
+            e = np.exp(h * t)
+            c = np.where(disc > 0, 0.5 * (slow + fast), e * np.cos(s * t))
+            sn = np.where(disc > 0, 0.5 * (slow - fast) / s, e * np.sin(s * t) / s)
+            sn = np.where(s > 0, sn, e * t)
+    elif disc > 0:
+        s = sqrt(disc)
+        fast, slow = exp((h - s) * t), exp((h + s) * t)
+        c, sn = 0.5 * (slow + fast), 0.5 * (slow - fast) / s
+    elif disc < 0:
+        s = sqrt(-disc)
+        e = exp(h * t)
+        c, sn = e * cos(s * t), e * sin(s * t) / s
+    else:
+        e = exp(h * t)
+        c, sn = e, e * t
+
+    # c and sn already include the e^(ht) decay: exp(M t) = e^(ht) ((cosh - h sinh/s) I + (sinh/s) M)
+    return c - h * sn, sn, -sn / k2, c + h * sn
+
+
+class SecondOrderAnimatorExact(SecondOrderAnimatorBase):
+    """
+    Solves the system exactly over each step instead of stepping it forward.
+
+    The target is taken to move in a straight line (at `dx`) across the step, which makes the
+    answer a fixed 2x2 matrix exponential applied to how far y is from where the target pulls it.
+    That matrix only depends on the k values and dt, so it is kept for as long as dt stays the same
+    (every step, on a fixed tick) and a step is then a handful of multiplies; it is unconditionally
+    stable, never sub-steps, and is just as right at 4fps as at 240fps. Works with floats, Vec2 and numpy arrays (and numpy k values).
+    """
+
+    def __init__(self, frequency: K, damping: K, response: K, x_initial: A, y_initial: A, y_d_initial: A):
+        super().__init__(frequency, damping, response, x_initial, y_initial, y_d_initial)
+        self._transition_dt: float | None = None
+        self._transition: tuple[K, K, K, K] = (1.0, 0.0, 0.0, 1.0)
+
+    def calc_k_vals(self) -> None:
+        super().calc_k_vals()
+        self._transition_dt = None
+
+    def transition(self, dt: float) -> tuple[K, K, K, K]:
+        """exp(M dt) for the current k values; the last one is reused while dt doesn't change."""
+        if dt != self._transition_dt:
+            self._transition = _transition(self.k1, self.k2, dt)
+            self._transition_dt = dt
+        return self._transition
+
+    def update(self, dt: float, nx: A, dx: A | None = None) -> A:
+        if dt <= 0:
+            return self.y
+        if dx is None:
+            dx = (nx - self.xp) / dt
+        self.xp = nx
+
+        # With the target at nx + dx (t - dt), y settles on nx + dx (k3 - k1) (moving at dx);
+        # e and v are how far y and dy are from that at the start of the step.
+        lag = dx * (self.k3 - self.k1)
+        e = self.y - nx + dx * dt - lag
+        v = self.dy - dx
+        m11, m12, m21, m22 = self.transition(dt)
+        e, v = e * m11 + v * m12, e * m21 + v * m22
+
+        self.y = nx + lag + e
+        self.dy = dx + v
+        return self.y
+
+
+ProceduralAnimator = SecondOrderAnimatorExact
 
 
 def update_default_animator(new_default: type[SecondOrderAnimator]):
@@ -0,0 +1,89 @@
+"""
+Shared GL programs and static geometry, so every shader is compiled and linked once per context.
+
+Anything drawing with a custom shader describes it as a module-level ShaderSource and asks the
+context's ShaderCache for the program, instead of calling `ctx.program` per instance. Programs are
+shared, so uniforms that differ between users have to be set before each render, not once at init.
+
+Module-level sources are passed through `register`, so `warm` (called once at launch) can compile
+them all up front rather than during the first frame or wave that needs them.
+"""
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import hashlib
+from logging import getLogger
+from weakref import WeakKeyDictionary
+
+import arcade
+import arcade.gl as gl
+from arcade.gl import geometry
+
+logger = getLogger("jam2025")
+
+@dataclass(frozen=True)
+class ShaderSource:
+    vertex_shader: str
+    fragment_shader: str | None = None
+    geometry_shader: str | None = None
+    varyings: tuple[str, ...] | None = None
+    varyings_capture_mode: str = "interleaved"
+
+    @property
+    def key(self) -> str:
+        """A hash of everything that goes into the compiled program."""
+        parts = (self.vertex_shader, self.fragment_shader or "", self.geometry_shader or "",
+                 ",".join(self.varyings or ()), self.varyings_capture_mode)
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+KNOWN_SHADERS: list[ShaderSource] = []
+
+def register(source: ShaderSource) -> ShaderSource:
+    """Add `source` to the ones `warm` compiles by default; returns it."""
+    if source not in KNOWN_SHADERS:
+        KNOWN_SHADERS.append(source)
+    return source
+
+class ShaderCache:
+    def __init__(self, ctx: arcade.ArcadeContext) -> None:
+        self.ctx = ctx
+        self._programs: dict[str, gl.Program] = {}
+        self._geometries: dict[str, gl.Geometry] = {}
+
+    def program(self, source: ShaderSource) -> gl.Program:
+        key = source.key
+        if key not in self._programs:
+            self._programs[key] = self.ctx.program(
+                vertex_shader=source.vertex_shader,
+                fragment_shader=source.fragment_shader,
+                geometry_shader=source.geometry_shader,
+                varyings=list(source.varyings) if source.varyings is not None else None,
+                varyings_capture_mode=source.varyings_capture_mode
+            )
+        return self._programs[key]
+
+    def geometry(self, name: str, factory: Callable[[], gl.Geometry]) -> gl.Geometry:
+        """A static geometry made once by `factory`; don't write to its buffers."""
+        if name not in self._geometries:
+            self._geometries[name] = factory()
+        return self._geometries[name]
+
+    def quad_2d_fs(self) -> gl.Geometry:
+        """The full screen quad every post-processing pass draws with."""
+        return self.geometry("quad_2d_fs", geometry.quad_2d_fs)
+
+    def warm(self, sources: Iterable[ShaderSource] | None = None) -> None:
+        """Compile `sources` (every registered ShaderSource, by default) now."""
+        sources = list(sources if sources is not None else KNOWN_SHADERS)
+        for source in sources:
+            self.program(source)
+        self.quad_2d_fs()
+        logger.debug(f"Warmed {len(self._programs)} shader programs")
+
+_caches: WeakKeyDictionary[gl.Context, ShaderCache] = WeakKeyDictionary()
+
+def get_shader_cache(ctx: arcade.ArcadeContext | None = None) -> ShaderCache:
+    """The ShaderCache of `ctx` (the window's, by default)."""
+    ctx = ctx or arcade.get_window().ctx
+    if ctx not in _caches:
+        _caches[ctx] = ShaderCache(ctx)
+    return _caches[ctx]
@@ -0,0 +1,50 @@
+from contextlib import AbstractContextManager, nullcontext
+from time import perf_counter
+
+class _Stage:
+    __slots__ = ("name", "start", "timer")
+
+    def __init__(self, timer: "StageTimer", name: str) -> None:
+        self.timer = timer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(self, *args: object) -> None:
+        self.timer.totals[self.name] += perf_counter() - self.start
+        self.timer.counts[self.name] += 1
+
+class StageTimer:
+    """Adds up wall time per named stage: `with timer("collision"): ...`.
+
+    Stages of the same name add together; don't nest a stage inside itself."""
+
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self._stages: dict[str, _Stage] = {}
+
+    def __call__(self, name: str) -> AbstractContextManager:
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage(self, name)
+            self.totals[name] = 0.0
+            self.counts[name] = 0
+        return stage
+
+    def reset(self) -> None:
+        for name in self.totals:
+            self.totals[name] = 0.0
+            self.counts[name] = 0
+
+class _NullTimer(StageTimer):
+    """Times nothing; the default for everything that takes a timer."""
+
+    _null = nullcontext()
+
+    def __call__(self, name: str) -> AbstractContextManager:
+        return self._null
+
+NULL_TIMER: StageTimer = _NullTimer()
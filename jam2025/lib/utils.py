@@ -1,6 +1,8 @@
 import math
 import os
+import sys
 import threading
+from pathlib import Path
 
 from typing import TYPE_CHECKING, Any
 if TYPE_CHECKING:
@@ -64,6 +66,26 @@ def open_settings(name: str = "USB Video Device") -> None:
     thread = threading.Thread(target = _open_settings, args = (name,))
     thread.start()
 
+def user_cache_dir(name: str) -> Path:
+    """A folder for the game's `name` cache in the user's cache directory (which doesn't have to exist yet)."""
+    if sys.platform == "win32":
+        root = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        root = Path.home() / "Library" / "Caches"
+    else:
+        root = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return root / "jam2025" / name
+
+def user_data_dir(name: str) -> Path:
+    """A folder for the game's `name` files (replays and such) in the user's data directory; absolute names are used as is."""
+    if sys.platform == "win32":
+        root = Path(os.environ.get("APPDATA") or Path.home() / "AppData" / "Roaming")
+    elif sys.platform == "darwin":
+        root = Path.home() / "Library" / "Application Support"
+    else:
+        root = Path(os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share")
+    return root / "jam2025" / name
+
 def frame_data_to_image(data: np.ndarray) -> Image.Image:
     return Image.fromarray(data, mode = "RGB")
 
@@ -0,0 +1,170 @@
+"""
+Plays the game with no window, as fast as it will go, and reports how it went.
+
+    python -m jam2025.simulate --seconds 300 --path figure8
+    python -m jam2025.simulate --waves boss,boss2 --invincible
+    python -m jam2025.simulate --replay replays/2025-08-01_12-00-00.replay
+
+This is the load test for new wave content and the before/after check for engine work.
+"""
+import os
+# Has to happen before arcade (pyglet) is imported.
+os.environ.setdefault("ARCADE_HEADLESS", "1")
+
+import argparse
+import math
+from collections.abc import Callable
+from time import perf_counter
+
+import arcade
+from arcade.types import Point2
+
+from jam2025.core.game.constants import GAME_WAVES, WAVES, load_constants
+from jam2025.core.game.replay import Replay, ReplayHeader, ReplayRecorder, load_replay
+from jam2025.core.game.simulation import Simulation
+from jam2025.core.settings import settings
+from jam2025.core.sound import sounds
+from jam2025.lib.stage_timer import StageTimer
+from jam2025.lib.typing import Seconds
+
+type CursorPath = Callable[[Seconds, tuple[float, float]], Point2]
+
+def _still(t: Seconds, size: tuple[float, float]) -> Point2:
+    return (size[0] / 2, size[1] / 2)
+
+def _circle(t: Seconds, size: tuple[float, float]) -> Point2:
+    return (size[0] * (0.5 + 0.3 * math.cos(t)), size[1] * (0.5 + 0.3 * math.sin(t)))
+
+def _figure8(t: Seconds, size: tuple[float, float]) -> Point2:
+    return (size[0] * (0.5 + 0.4 * math.sin(t * 0.7)), size[1] * (0.5 + 0.3 * math.sin(t * 1.4)))
+
+def _sweep(t: Seconds, size: tuple[float, float]) -> Point2:
+    # Back and forth across the whole screen, every few seconds.
+    x = abs((t / 4) % 2 - 1)
+    return (size[0] * (0.05 + 0.9 * x), size[1] * 0.5)
+
+CURSOR_PATHS: dict[str, CursorPath] = {
+    "still": _still,
+    "circle": _circle,
+    "figure8": _figure8,
+    "sweep": _sweep
+}
+
+def _stats(sim: Simulation, wall: float, peak_bullets: int) -> dict[str, float]:
+    return {
+        "ticks": sim.ticks,
+        "game_time": sim.time,
+        "wall_time": wall,
+        "ticks_per_second": sim.ticks / wall if wall else math.inf,
+        "peak_bullets": peak_bullets,
+        "score": sim.score_tracker.score,
+        "waves": sim.wave_player.wave_count,
+        "health": sim.character.health
+    }
+
+def run(sim: Simulation, path: CursorPath, size: tuple[float, float], seconds: Seconds, invincible: bool = False) -> dict[str, float]:
+    """Step `sim` for `seconds` of game time (or until game over); returns run stats."""
+    if invincible:
+        sim.character.max_health = sim.character.health = math.inf
+
+    ticks = round(seconds * sim.tick_rate)
+    peak_bullets = 0
+    start = perf_counter()
+    for _ in range(ticks):
+        sim.step(path(sim.time, size))
+        peak_bullets = max(peak_bullets, len(sim.bullet_list.bullets))
+        if sim.game_over:
+            break
+    wall = perf_counter() - start
+
+    return _stats(sim, wall, peak_bullets)
+
+def run_replay(sim: Simulation, replay: Replay) -> dict[str, float]:
+    """Play every recorded tick of `replay` through `sim`; returns run stats."""
+    sim.play(replay)
+    sim.start()
+    peak_bullets = 0
+    start = perf_counter()
+    while not sim.playback_finished:
+        sim.step()
+        peak_bullets = max(peak_bullets, len(sim.bullet_list.bullets))
+    wall = perf_counter() - start
+
+    return _stats(sim, wall, peak_bullets)
+
+def report(stats: dict[str, float], timer: StageTimer) -> str:
+    lines = [
+        f"ticks          {stats['ticks']} ({stats['game_time']:.1f}s of game time)",
+        f"wall time      {stats['wall_time']:.2f}s",
+        f"ticks/second   {stats['ticks_per_second']:.0f} ({stats['ticks_per_second'] * stats['game_time'] / max(stats['ticks'], 1):.1f}x real time)",
+        f"peak bullets   {stats['peak_bullets']}",
+        f"waves reached  {stats['waves']}",
+        f"final score    {stats['score']}",
+        f"health left    {stats['health']}",
+        "",
+        f"{'stage':<12} {'total (s)':>10} {'per tick (us)':>14} {'share':>7}"
+    ]
+    ticks = max(stats["ticks"], 1)
+    for name, total in sorted(timer.totals.items(), key = lambda x: -x[1]):
+        lines.append(f"{name:<12} {total:>10.3f} {total / ticks * 1e6:>14.1f} {total / stats['wall_time']:>7.1%}")
+    return "\n".join(lines)
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog = "python -m jam2025.simulate", description = "Run the game headless and report throughput.")
+    parser.add_argument("--waves", default = ",".join(GAME_WAVES), help = "comma separated wave names (default: the game's wave list)")
+    parser.add_argument("--seconds", type = float, default = 120, help = "game seconds to simulate (default: 120)")
+    parser.add_argument("--tick-rate", type = float, default = 120, help = "ticks per game second (default: 120)")
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--path", choices = list(CURSOR_PATHS), default = "figure8", help = "scripted cursor path (default: figure8)")
+    parser.add_argument("--size", default = f"{settings.window_width}x{settings.window_height}", help = "screen size the waves are laid out for, WxH")
+    parser.add_argument("--invincible", action = "store_true", help = "keep playing through damage instead of stopping at game over")
+    parser.add_argument("--gpu", action = "store_true", help = "move bullets on the GPU")
+    parser.add_argument("--record", help = "record the run to this replay file")
+    parser.add_argument("--replay", help = "play back a recorded game instead (its waves, seed, size and integrator override the options above)")
+    args = parser.parse_args(argv)
+
+    if args.record and args.invincible:
+        parser.error("an --invincible run can't be replayed, so it can't be recorded")
+
+    replay = load_replay(args.replay) if args.replay else None
+    if replay is not None:
+        args.waves = ",".join(replay.header.waves)
+        args.tick_rate = replay.header.tick_rate
+        args.seed = replay.header.seed
+        args.size = "{}x{}".format(*replay.header.size)
+        args.gpu = replay.header.gpu_bullets
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    settings.gpu_bullets = args.gpu
+    sounds.enabled = False
+
+    # Enemies and the character still make GL objects, so a (headless) context is needed.
+    arcade.Window(width, height, "jam2025 simulate", visible = False)
+    load_constants((width, height))
+
+    names = [name.strip() for name in args.waves.split(",") if name.strip()]
+    unknown = [name for name in names if name not in WAVES]
+    if unknown:
+        parser.error(f"unknown wave(s): {', '.join(unknown)} (known: {', '.join(WAVES)})")
+
+    timer = StageTimer()
+    sim = Simulation([WAVES[name] for name in names], tick_rate = args.tick_rate, seed = args.seed, timer = timer,
+                     kill_mult = replay.header.kill_mult if replay is not None else 1)
+    if replay is None:
+        sim.start()
+        if args.record:
+            sim.recorder = ReplayRecorder(args.record, ReplayHeader(sim.tick_rate, sim.seed, sim.score_tracker.kill_mult, (width, height), names, sim.gpu_bullets))
+        stats = run(sim, CURSOR_PATHS[args.path], (width, height), args.seconds, args.invincible)
+        if sim.recorder is not None:
+            sim.recorder.close(sim.score_tracker.score)
+        print(report(stats, timer))
+        return
+
+    stats = run_replay(sim, replay)
+    print(report(stats, timer))
+    if replay.score is not None:
+        verdict = "matches" if (replay.ticks, replay.score) == (stats["ticks"], stats["score"]) else "DOES NOT MATCH"
+        print(f"\nrecorded score {replay.score} after {replay.ticks} ticks: {verdict}")
+
+if __name__ == "__main__":
+    main()
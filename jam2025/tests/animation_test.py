@@ -1,7 +1,6 @@
 from arcade import SpriteList, View
-from jam2025.core.game.bullet import bullet_sprite
 from jam2025.core.void import Void
-from jam2025.data.loading import load_music
+from jam2025.data.loading import load_music, load_spritesheet
 
 
 class AnimationTestView(View):
@@ -13,7 +12,7 @@ class AnimationTestView(View):
 
         self.spritelist = SpriteList()
 
-        self.sprite = bullet_sprite
+        self.sprite = load_spritesheet("bullet", 1, 30, 30, 30)
         self.sprite.position = self.window.center
 
         self.spritelist.append(self.sprite)
@@ -2,6 +2,7 @@ from arcade import View, Vec2, LBWH
 
 from jam2025.core.game.bullet import PATTERNS, BulletEmitter, BulletList, RainbowBullet
 from jam2025.core.game.character import Character
+from jam2025.core.game.lux import lux_batch
 
 from jam2025.core.game.score_tracker import ScoreTracker
 from jam2025.core.void import Void
@@ -63,3 +64,4 @@ class IntegrationTestView(View):
         self.bullet_list.draw()
         self.emitter.draw()
         self.character.draw()
+        lux_batch.flush()
@@ -4,6 +4,7 @@ from arcade.experimental.bloom_filter import BloomFilter
 
 from jam2025.core.game.bullet import PATTERNS, BulletList, CycleBulletEmitter, RainbowBullet, SpinningBulletEmitter
 from jam2025.core.game.character import Character
+from jam2025.core.game.lux import lux_batch
 
 from jam2025.core.game.score_tracker import ScoreTracker
 from jam2025.core.ui.bar import HealthBar
@@ -117,6 +118,7 @@ class GameView(View):
         self.emitter.draw()
         self.emitter2.draw()
         self.character.draw()
+        lux_batch.flush()
 
     def on_draw(self) -> bool | None:
         self.clear()
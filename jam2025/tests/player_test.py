@@ -3,6 +3,7 @@ from random import random
 from arcade import Vec2, View
 from jam2025.core.game.bullet import PATTERNS, BulletEmitter, BulletList, Bullet, RainbowBullet
 from jam2025.core.game.character import Character
+from jam2025.core.game.lux import lux_batch
 from jam2025.core.game.score_tracker import ScoreTracker
 from jam2025.core.void import Void
 from jam2025.data.loading import load_music
@@ -57,3 +58,4 @@ class PlayerTestView(View):
         self.bullet_list.draw()
 
         self.character.draw()
+        lux_batch.flush()
@@ -1,14 +1,15 @@
+from dataclasses import replace
+from datetime import datetime
 from arcade import Sprite, Text, View, Vec2, LBWH
 import arcade
-from arcade.clock import GLOBAL_CLOCK
-from arcade.experimental.bloom_filter import BloomFilter
 
-from jam2025.core.game.character import Character
-from jam2025.core.game.constants import WAVES
-from jam2025.core.game.score_tracker import ScoreTracker
-from jam2025.core.game.wave import BossWave, WavePlayer
+from jam2025.core.game.constants import GAME_WAVES, game_waves
+from jam2025.core.game.replay import ReplayHeader, ReplayRecorder, load_replay
+from jam2025.core.game.simulation import Simulation
+from jam2025.core.game.wave import BossWave
 from jam2025.core.ui.bar import HealthBar, WaveBar
 from jam2025.core.ui.button import HoverButton
+from jam2025.core.ui.profiler import ProfilerOverlay
 from jam2025.core.void import Void
 from jam2025.data.loading import load_music, load_sprite, load_texture
 from jam2025.core.webcam import WebcamController, Webcam
@@ -16,6 +17,11 @@ from jam2025.core.webcam import WebcamController, Webcam
 from jam2025.core.settings import settings
 from jam2025.lib.anim import ease_linear, perc
 from jam2025.lib.frame import Frame, FrameConfig, TextureConfig, Bloom
+from jam2025.lib.frame_profiler import FrameProfiler
+from jam2025.lib.frame_trace import save_trace
+from jam2025.lib.logging import logger
+from jam2025.lib.stage_timer import NULL_TIMER
+from jam2025.lib.utils import user_data_dir
 
 MAX_SPOTLIGHT_SCALE = 4
 MIN_SPOTLIGHT_SCALE = 2
@@ -30,21 +36,16 @@ class GameView(View):
         self.music = load_music("found-in-space-17")
         self.player = self.music.play(volume = 0.05, loop = True)
 
-        self.character = Character()
-        self.character.position = Vec2(0, 0)
+        self.simulation = Simulation(game_waves(), kill_mult = 5)
+        self.character = self.simulation.character
+        self.score_tracker = self.simulation.score_tracker
+        self.wave_player = self.simulation.wave_player
 
         self.health_bar = HealthBar(self.window.rect.top_right - Vec2(10, 10))
         self.wave_bar = WaveBar(Vec2(0, 0))
         self.wave_bar.position = self.window.rect.top_center + Vec2(self.wave_bar.middle_sprite.width / 2, -10)
         self.wave_text = Text("0", self.wave_bar.middle_sprite.center_x, self.wave_bar.middle_sprite.center_y, font_size = 22, font_name = "GohuFont 11 Nerd Font Mono", anchor_y = "center", anchor_x = "center", align = "center")
 
-        self.score_tracker = ScoreTracker()
-        self.score_tracker.kill_mult = 5
-
-        waves = [WAVES["rectangle"], WAVES["left_and_right"], WAVES["triangle"], WAVES["boss"],
-                 WAVES["rectangle"], WAVES["left_and_right"], WAVES["triangle"], WAVES["boss2"]]
-        self.wave_player = WavePlayer(waves, self.character, self.score_tracker)
-
         if settings.has_webcam:
             webcam = settings.connected_webcam
         else:
@@ -64,23 +65,27 @@ class GameView(View):
         self.mouse_pos = self.center
 
         self.score_text = Text("Score: 0", 5, self.height - 5, font_size = 22, font_name = "GohuFont 11 Nerd Font Mono", anchor_y = "top")
-        self.controls_text = Text("[M]: Use Mouse\n[R]: Reset\n[D]: Debug Overlay\n[Numpad *]: Heal\n[S]Spotlight\n[B] Bloom\n[W] Webcam\n[F] Show FPS\n[V] Show Void", 5, 5,
+        self.controls_text = Text("[M]: Use Mouse\n[R]: Reset\n[D]: Debug Overlay\n[Numpad *]: Heal\n[S]Spotlight\n[B] Bloom\n[W] Webcam\n[F] Show FPS\n[P] Profiler\n[V] Show Void\n[L] Watch Last Replay\n[T] Record Frame Times", 5, 5,
                                   font_size = 11, font_name = "GohuFont 11 Nerd Font Mono", anchor_y = "bottom",
                                   multiline = True, width = int(self.width / 4))
 
         self.fps_text = Text("FPS 0", 5, self.score_text.bottom - 5, font_size = 22, font_name = "GohuFont 11 Nerd Font Mono", anchor_y = "top")
         self.show_fps = False
 
+        self.replay_text = Text("REPLAY", 5, 5, font_size = 22, font_name = "GohuFont 11 Nerd Font Mono", anchor_y = "bottom")
+
+        self.profiler = FrameProfiler(self.window.ctx)
+        self.profiler_overlay = ProfilerOverlay(self.profiler, Vec2(5, self.fps_text.bottom - 5))
+        # Every frame's delta time while recording a trace, for the animator benchmark.
+        self.frame_trace: list[float] | None = None
+
         spotlight_texture = load_texture("spotlight")
         self.spotlight = Sprite(spotlight_texture)
         self.show_spotlight = True
 
         self.bloom_on = False
         self.post_processing = Frame(FrameConfig(self.size, self.size, self.center, TextureConfig()), self.window.ctx)
-        self.post_processing.add_process(Bloom(self.size, 3, self.window.ctx))
-
-        self.bloom = 5.0
-        self.bloom_filter = BloomFilter(int(self.width), int(self.height), self.bloom)
+        self.post_processing.add_process(Bloom(settings.bloom_mips, self.window.ctx, scale = settings.bloom_scale, storage = settings.bloom_storage))
 
         self.game_over = False
 
@@ -95,6 +100,8 @@ class GameView(View):
         elif symbol == arcade.key.D:
             settings.debug = not settings.debug
         elif symbol == arcade.key.NUM_MULTIPLY:
+            # Not something a replay can reproduce.
+            self.stop_recording()
             self.character.health = self.character.max_health
         elif symbol == arcade.key.R:
             self.reset()
@@ -110,18 +117,92 @@ class GameView(View):
             self.show_fps = not self.show_fps
         elif symbol == arcade.key.V:
             self.show_void = not self.show_void
+        elif symbol == arcade.key.P:
+            self.toggle_profiler()
+        elif symbol == arcade.key.L:
+            self.play_last_replay()
+        elif symbol == arcade.key.T:
+            self.toggle_frame_trace()
+
+    def toggle_profiler(self) -> None:
+        # Off, nothing gets handed the profiler, so the simulation's stages cost nothing.
+        self.profiler.enabled = not self.profiler.enabled
+        if self.profiler.enabled:
+            self.profiler.clear()
+        timer = self.profiler if self.profiler.enabled else NULL_TIMER
+        self.simulation.timer = self.wave_player.timer = self.webcam.timer = timer
+
+    def toggle_frame_trace(self) -> None:
+        if self.frame_trace is None:
+            self.frame_trace = []
+            return
+        path = user_data_dir("traces") / f"{datetime.now().astimezone():%Y-%m-%d_%H-%M-%S}.txt"
+        save_trace(path, self.frame_trace, f"{len(self.frame_trace)} frames at {int(self.window.width)}x{int(self.window.height)}, void {settings.void_quality}, bloom {'on' if self.bloom_on else 'off'}")
+        logger.info(f"Saved {len(self.frame_trace)} frame times to {path}")
+        self.frame_trace = None
 
     def reset(self) -> None:
         self.player.seek(0.0)
-        self.character.reset()
-        self.score_tracker.reset()
-        self.wave_player.reset()
-        self.wave_player.start()
+        self.stop_recording()
+        self.simulation.reset()
+        self.start_game()
         self.game_over = False
         self.player.play()
 
+    def replay_header(self) -> ReplayHeader:
+        """What a replay of the current game records about it."""
+        return ReplayHeader(self.simulation.tick_rate, self.simulation.seed, self.score_tracker.kill_mult,
+                            (int(self.window.width), int(self.window.height)), GAME_WAVES, self.simulation.gpu_bullets)
+
+    def start_game(self) -> None:
+        self.simulation.start()
+        if settings.record_replays:
+            path = user_data_dir(settings.replay_folder) / f"{datetime.now().astimezone():%Y-%m-%d_%H-%M-%S}.replay"
+            self.simulation.recorder = ReplayRecorder(path, self.replay_header())
+
+    def play_last_replay(self) -> None:
+        """Watch the newest finished replay recorded with this game's waves, tick rate, window size and bullet integrator."""
+        header = self.replay_header()
+        folder = user_data_dir(settings.replay_folder)
+        recording = self.simulation.recorder.path if self.simulation.recorder is not None else None
+        for path in sorted(folder.glob("*.replay"), key = lambda p: p.stat().st_mtime, reverse = True):
+            if path == recording:
+                continue
+            try:
+                replay = load_replay(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping replay: {e}")
+                continue
+            if replay.score is not None and replace(replay.header, seed = header.seed) == header:
+                break
+        else:
+            logger.warning(f"No finished replays of this game in {folder}")
+            return
+
+        logger.info(f"Playing back {path.name}")
+        self.player.seek(0.0)
+        self.stop_recording()
+        self.simulation.play(replay)
+        self.simulation.start()
+        self.game_over = False
+        self.player.play()
+
+    def stop_recording(self, finished: bool = False) -> None:
+        if self.simulation.recorder is not None:
+            self.simulation.recorder.close(self.score_tracker.score if finished else None)
+            self.simulation.recorder = None
+
     def on_show_view(self) -> None:
-        self.wave_player.start()
+        self.start_game()
+
+    def on_hide_view(self) -> None:
+        self.stop_recording()
+        if self.frame_trace is not None:
+            self.toggle_frame_trace()
+
+    def on_resize(self, width: int, height: int) -> bool | None:
+        self.post_processing.resize((width, height))
+        self.post_processing.set_location((width // 2, height // 2), (width, height))
 
     def on_mouse_motion(self, x: int, y: int, dx: int, dy: int) -> bool | None:
         self.mouse_pos = (x, y)
@@ -131,6 +212,11 @@ class GameView(View):
             self.reset()
 
     def on_update(self, delta_time: float) -> bool | None:
+        if self.frame_trace is not None:
+            self.frame_trace.append(delta_time)
+        if self.profiler.enabled:
+            self.profiler_overlay.update(delta_time)
+
         if self.game_over:
             if self.use_mouse:
                 self.game_over_button.update(delta_time, self.mouse_pos)
@@ -139,18 +225,23 @@ class GameView(View):
                 self.game_over_button.update(delta_time, self.webcam.mapped_cursor)
             return
 
-        if self.webcam.webcam.connected and not self.use_mouse:
+        if self.simulation.playback is not None:
+            cursor = None
+        elif self.use_mouse:
+            cursor = self.mouse_pos
+        elif self.webcam.webcam.connected:
             self.webcam.update(delta_time)
-            self.character.update(delta_time, Vec2(*self.webcam.mapped_cursor if self.webcam.mapped_cursor else (0, 0))) if not self.use_mouse else self.character.update(delta_time, Vec2(*self.mouse_pos))
+            cursor = self.webcam.mapped_cursor if self.webcam.mapped_cursor else (0, 0)
         else:
-            self.character.update(delta_time, Vec2(*self.center)) if not self.use_mouse else self.character.update(delta_time, Vec2(*self.mouse_pos))
+            cursor = self.center
 
-        self.wave_player.update(delta_time)
+        with self.profiler("simulation"):
+            self.simulation.advance(delta_time, cursor)
         if isinstance(self.wave_player.current_wave, BossWave):
             self.wave_bar.percentage = 1 - perc(0, self.wave_player.current_wave.bullets_needed, self.wave_player.score_tracker.kills_per_wave[self.wave_player.score_tracker.wave])
             self.wave_text.text = f"{self.wave_player.current_wave.bullets_needed - self.wave_player.score_tracker.kills_per_wave[self.wave_player.score_tracker.wave]}"
         else:
-            self.wave_bar.percentage = perc(self.wave_player.current_wave_start_time, self.wave_player.current_wave_start_time + self.wave_player.current_wave.total_time, GLOBAL_CLOCK.time)
+            self.wave_bar.percentage = perc(self.wave_player.current_wave_start_time, self.wave_player.current_wave_start_time + self.wave_player.current_wave.total_time, self.simulation.time)
             self.wave_text.text = f"WAVE {self.wave_player.wave_count}"
 
         self.health_bar.percentage = (self.character.health / self.character.max_health)
@@ -162,9 +253,10 @@ class GameView(View):
 
         self.fps_text.text = f"FPS {1/delta_time:.1f}"
 
-        if self.character.health <= 0:
+        if self.character.health <= 0 or self.simulation.playback_finished:
             self.player.pause()
             self.game_over = True
+            self.stop_recording(finished = True)
 
     def on_draw(self) -> bool | None:
         self.clear()
@@ -174,6 +266,14 @@ class GameView(View):
         else:
             self.draw_basic()
 
+        with self.profiler("ui"), self.profiler.gpu("ui"):
+            self.draw_ui()
+
+        if self.profiler.enabled:
+            self.profiler_overlay.draw()
+        self.profiler.end_frame()
+
+    def draw_ui(self) -> None:
         if self.show_spotlight:
             arcade.draw_sprite(self.spotlight)
             if settings.debug:
@@ -201,19 +301,28 @@ class GameView(View):
         if self.show_fps:
             self.fps_text.draw()
 
-    def draw_basic(self) -> None:
+        if self.simulation.playback is not None:
+            self.replay_text.draw()
+
+    def draw_background(self) -> None:
         if self.show_void:
-            self.void.draw()
+            with self.profiler("void"), self.profiler.gpu("void"):
+                self.void.draw()
         if self.webcam.webcam.connected and self.show_webcam:
             self.webcam.draw()
-        self.wave_player.draw()
+
+    def draw_world(self) -> None:
+        with self.profiler("world"), self.profiler.gpu("world"):
+            self.wave_player.draw()
+
+    def draw_basic(self) -> None:
+        self.draw_background()
+        self.draw_world()
 
     def draw_bloomed(self) -> None:
         with self.post_processing.capture_unprocessed((0, 0, 0, 0)):
-            if self.show_void:
-                self.void.draw()
-            if self.webcam.webcam.connected and self.show_webcam:
-                self.webcam.draw()
-        with self.post_processing:
-            self.wave_player.draw()
-        self.post_processing.render()
+            self.draw_background()
+        self.post_processing.use()
+        self.draw_world()
+        with self.profiler("bloom"), self.profiler.gpu("bloom"):
+            self.post_processing.render()